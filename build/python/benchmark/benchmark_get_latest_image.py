@@ -0,0 +1,154 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from packaging.version import InvalidVersion, Version
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fake_ecr_public import FakeEcrPublicClient, TAG_SET_SIZES, MAX_RESULTS_LIMIT, generate_image_tags
+from get_latest_image import LatestImageManager
+from image_tag_cache import ImageTagCache
+
+# Constants
+REPOSITORY_NAME = "pingcloud-apps/pingfederate"
+GITLAB_TAGS = ["v1.18.0.0_RC1", "v1.18.3.0"]
+
+
+def expected_latest_image(gitlab_tag, tags) -> str:
+    """
+    Reference selection, independent of LatestImageManager: parse every tag as a PEP 440 version (the parse_version
+    ordering the lookup used to sort with, where _RC# is a release candidate), keep the #.#.#.# finals and release
+    candidates within the release of the Gitlab tag and take the highest.
+    """
+    gitlab_version = Version(gitlab_tag.lstrip("v"))
+    # Release candidates of the Gitlab tag accept any patch of the release, finals only the Gitlab tag's own patch
+    release_parts = 2 if gitlab_version.is_prerelease else 3
+
+    versions = []
+    for tag in tags:
+        try:
+            version = Version(tag)
+        except InvalidVersion:
+            continue
+        if len(version.release) == 4 and version.release[:release_parts] == gitlab_version.release[:release_parts] \
+                and (version.pre is None or version.pre[0] == "rc") and version.public == str(version) \
+                and not version.is_postrelease and not version.is_devrelease:
+            versions.append((version, tag))
+    return max(versions)[1]
+
+
+def measure(get_latest_image, client) -> dict:
+    """
+    Run a lookup twice: once for wall time and API calls, once under tracemalloc for peak memory (tracing slows it
+    down).
+    """
+    calls_before = client.call_count
+    start = time.perf_counter()
+    latest_image = get_latest_image()
+    wall_seconds = time.perf_counter() - start
+    api_calls = client.call_count - calls_before
+
+    tracemalloc.start()
+    get_latest_image()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"latest_image": latest_image, "wall_seconds": round(wall_seconds, 4), "peak_bytes": peak_bytes,
+            "api_calls": api_calls}
+
+
+def run_scenarios(tag_count, gitlab_tag) -> list:
+    tags = generate_image_tags(tag_count)
+    pages = math.ceil(tag_count / MAX_RESULTS_LIMIT)
+    client = FakeEcrPublicClient({REPOSITORY_NAME: tags})
+    results = []
+
+    def run(scenario, manager, expected_calls):
+        result = measure(manager.get_latest_image, client)
+        result.update(scenario=scenario, tags=tag_count, gitlab_tag=gitlab_tag, expected_api_calls=expected_calls,
+                      expected_latest_image=expected_latest_image(gitlab_tag, client.tags_by_repository[REPOSITORY_NAME]))
+        results.append(result)
+
+    run("stream", LatestImageManager(gitlab_tag, REPOSITORY_NAME, client=client), pages)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ImageTagCache(cache_dir, ttl_seconds=3600)
+
+        # The first lookup fills the cache, so peak memory is measured on a warm cache
+        run("cache-cold", LatestImageManager(gitlab_tag, REPOSITORY_NAME, client=client, cache=cache), pages)
+        run("cache-warm", LatestImageManager(gitlab_tag, REPOSITORY_NAME, client=client, cache=cache), 0)
+
+        # A newly pushed image shows up on the first page, so a refresh stops after the second page
+        client.tags_by_repository[REPOSITORY_NAME] = [f"{gitlab_tag.lstrip('v').split('_')[0]}_RC999"] + tags
+        run("cache-refresh", LatestImageManager(gitlab_tag, REPOSITORY_NAME, client=client, cache=cache,
+                                                refresh=True), min(2, math.ceil((tag_count + 1) / MAX_RESULTS_LIMIT)))
+
+        # ECR doesn't order tags, so an expired entry is listed in full and picks up a new tag on any page
+        infrastructure_version, major_version, patch_version = gitlab_tag.lstrip('v').split('.')[:3]
+        patch_version = "99" if "RC" in gitlab_tag else patch_version
+        new_tag = f"{infrastructure_version}.{major_version}.{patch_version}.99999"
+        client.tags_by_repository[REPOSITORY_NAME].insert(len(tags) * 5 // 6, new_tag)
+        expired_cache = ImageTagCache(cache_dir, ttl_seconds=0)
+        run("cache-expired", LatestImageManager(gitlab_tag, REPOSITORY_NAME, client=client, cache=expired_cache),
+            math.ceil((tag_count + 2) / MAX_RESULTS_LIMIT))
+
+    return results
+
+
+def check_results(results, max_seconds_per_10k_tags) -> list:
+    failures = []
+    for result in results:
+        name = f"{result['scenario']} {result['tags']} tags {result['gitlab_tag']}"
+        if result["latest_image"] != result["expected_latest_image"]:
+            failures.append(f"{name}: got {result['latest_image']}, expected {result['expected_latest_image']}")
+        if result["api_calls"] > result["expected_api_calls"]:
+            failures.append(f"{name}: {result['api_calls']} API calls, expected at most {result['expected_api_calls']}")
+        if max_seconds_per_10k_tags is not None and \
+                result["wall_seconds"] > max_seconds_per_10k_tags * max(1.0, result["tags"] / 10000):
+            failures.append(f"{name}: took {result['wall_seconds']}s, over the "
+                            f"{max_seconds_per_10k_tags}s per 10k tags budget")
+    return failures
+
+
+def print_results(results) -> None:
+    print(f"{'scenario':<14} {'tags':>7} {'gitlab tag':<14} {'latest image':<16} {'wall s':>8} {'peak KiB':>9} "
+          f"{'API calls':>9}")
+    for result in results:
+        print(f"{result['scenario']:<14} {result['tags']:>7} {result['gitlab_tag']:<14} "
+              f"{result['latest_image']:<16} {result['wall_seconds']:>8} {result['peak_bytes'] // 1024:>9} "
+              f"{result['api_calls']:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark LatestImageManager.get_latest_image against an offline ECR-public stand-in."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=TAG_SET_SIZES,
+                        help=f"synthetic tag set sizes (default: {' '.join(map(str, TAG_SET_SIZES))})")
+    parser.add_argument("--max-seconds-per-10k-tags", type=float,
+                        help="fail if a lookup takes longer than this per 10k tags")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON to FILE")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    all_results = [result for size in args.sizes for gitlab_tag in GITLAB_TAGS
+                   for result in run_scenarios(size, gitlab_tag)]
+    print_results(all_results)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(all_results, json_file, indent=2)
+
+    all_failures = check_results(all_results, args.max_seconds_per_10k_tags)
+    for failure in all_failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if all_failures else 0)
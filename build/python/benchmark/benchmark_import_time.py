@@ -0,0 +1,98 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Constants
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+
+# Python CLI entry points launched as short-lived subprocesses from shell scripts:
+# name -> (directory relative to the repo root, module, import time budget in milliseconds)
+ENTRY_POINTS = {
+    "get_latest_image": ("build/python/src", "get_latest_image", 100),
+    "update_image_tags": ("build/python/src", "update_image_tags", 60),
+    "verify_descriptor_json": ("k8s-configs/cluster-tools/base/git-ops/validation", "verify_descriptor_json", 60),
+    "p1_env_setup_and_teardown": ("ci-scripts/deploy/ping-one", "p1_env_setup_and_teardown", 400),
+}
+
+
+def parse_import_times(stderr) -> list:
+    """
+    Args:
+        stderr (string): output of python -X importtime
+
+    Returns:
+        list: (self us, cumulative us, nesting depth, module name) for every import
+    """
+    import_times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        import_times.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return import_times
+
+
+def measure_import_time(directory, module):
+    """
+    Import the module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (cumulative import time of the module in ms, all import times), or (None, error output) if the
+        import failed
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.join(REPO_ROOT, directory), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1:]
+
+    import_times = parse_import_times(result.stderr)
+    cumulative_us = next(cumulative for _, cumulative, depth, name in reversed(import_times)
+                         if depth == 0 and name == module)
+    return cumulative_us / 1000, import_times
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of the repo's Python CLI entry points against per entry point budgets."
+    )
+    parser.add_argument("--runs", type=int, default=5, help="imports per entry point, the fastest counts (default: 5)")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. for slower CI runners (default: 1.0)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to show per entry point (default: 5)")
+    parser.add_argument("entry_points", nargs="*", default=list(ENTRY_POINTS),
+                        help=f"entry points to measure (default: {' '.join(ENTRY_POINTS)})")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    failures = []
+
+    for entry_point in args.entry_points:
+        directory, module, budget_ms = ENTRY_POINTS[entry_point]
+        budget_ms *= args.budget_scale
+
+        measurements = [measure_import_time(directory, module) for _ in range(args.runs)]
+        if any(import_ms is None for import_ms, _ in measurements):
+            error = next(output for import_ms, output in measurements if import_ms is None)
+            failures.append(f"{entry_point}: import failed: {' '.join(error)}")
+            continue
+
+        import_ms, import_times = min(measurements, key=lambda measurement: measurement[0])
+        status = "ok" if import_ms <= budget_ms else "OVER BUDGET"
+        print(f"{entry_point}: {import_ms:.1f} ms (budget {budget_ms:.0f} ms) {status}")
+
+        heaviest = sorted(import_times, key=lambda import_time: import_time[0], reverse=True)[:args.top]
+        for self_us, cumulative_us, _, name in heaviest:
+            print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+        if import_ms > budget_ms:
+            failures.append(f"{entry_point}: {import_ms:.1f} ms is over the {budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,96 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+# Constants
+MAX_RESULTS_LIMIT = 1000
+TAG_SET_SIZES = [1000, 10000, 100000]
+
+
+def generate_image_tags(count, seed=0) -> list:
+    """
+    Generate a realistic mix of ECR image tags: #.#.#.# finals, #.#.#.#_RC# release candidates, branch -latest tags
+    and commit SHA tags, in random order.
+
+    Args:
+        count (int): number of tags to generate
+        seed (int): random seed so that every run sees the same tag set
+
+    Returns:
+        list: unique tag names
+    """
+    rand = random.Random(seed)
+    tags = set()
+    while len(tags) < count:
+        kind = rand.random()
+        infrastructure, major, pcb_patch, pcd_patch = 1, rand.randint(10, 19), rand.randint(0, 9), rand.randint(0, 9)
+        if kind < 0.6:
+            tags.add(f"{infrastructure}.{major}.{pcb_patch}.{pcd_patch}_RC{rand.randint(1, 40)}")
+        elif kind < 0.75:
+            tags.add(f"{infrastructure}.{major}.{pcb_patch}.{pcd_patch}")
+        elif kind < 0.85:
+            tags.add(f"v{infrastructure}.{major}-release-branch-latest-{rand.randint(0, 10 ** 6)}")
+        else:
+            tags.add(f"{rand.getrandbits(64):016x}")
+
+    tags = sorted(tags)
+    rand.shuffle(tags)
+    return tags
+
+
+class FakeEcrPublicClient:
+    """In-memory stand-in for the ecr-public describe_image_tags API"""
+
+    def __init__(self, tags_by_repository):
+        """
+        Args:
+            tags_by_repository (dict): repository name -> list of tag names, in the order the API returns them
+        """
+        self.tags_by_repository = tags_by_repository
+        self.call_count = 0
+
+        # Each tag keeps the push time it was first seen with, so tags added later are pushed later
+        self.first_pushed_at = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        self.pushed_at_by_tag = {}
+
+    def get_pushed_at(self, tag) -> datetime:
+        pushed_at = self.pushed_at_by_tag.get(tag)
+        if pushed_at is None:
+            pushed_at = self.first_pushed_at + timedelta(minutes=len(self.pushed_at_by_tag))
+            self.pushed_at_by_tag[tag] = pushed_at
+        return pushed_at
+
+    def describe_image_tags(self, repositoryName, maxResults=100, nextToken=None, **kwargs) -> dict:
+        """
+        Same request and response shape as ECRPublic.Client.describe_image_tags
+        """
+        self.call_count += 1
+
+        if not 1 <= maxResults <= MAX_RESULTS_LIMIT:
+            raise ValueError(f"maxResults must be between 1 and {MAX_RESULTS_LIMIT}")
+        if repositoryName not in self.tags_by_repository:
+            raise ValueError(f"RepositoryNotFoundException: {repositoryName}")
+
+        tags = self.tags_by_repository[repositoryName]
+        start = int(nextToken) if nextToken is not None else 0
+        end = min(start + maxResults, len(tags))
+
+        response = {
+            "imageTagDetails": [
+                {
+                    "imageTag": tags[index],
+                    "createdAt": self.get_pushed_at(tags[index]),
+                    "imageDetail": {
+                        "imageDigest": f"sha256:{index:064x}",
+                        "imageSizeInBytes": 100 * 1024 * 1024,
+                        "imagePushedAt": self.get_pushed_at(tags[index]),
+                        "imageManifestMediaType": "application/vnd.docker.distribution.manifest.v2+json",
+                    },
+                }
+                for index in range(start, end)
+            ],
+            "ResponseMetadata": {"HTTPStatusCode": 200, "RetryAttempts": 0},
+        }
+        if end < len(tags):
+            response["nextToken"] = str(end)
+
+        return response
@@ -1,11 +1,14 @@
-import sys
-from botocore.config import Config
-import utils
+import argparse
 import re as regex
-from pkg_resources import parse_version
+import utils
+from image_tag_cache import ImageTagCache
 
 # Constants
 SEMANTIC_VERSION_REGEX = "([0-9]+)\.([0-9]+)\.([0-9]+)\.([0-9]+)(_RC[0-9]+)?"
+# ECR public only works against us-east-1
+ECR_PUBLIC_REGION = "us-east-1"
+# Upper bound on concurrent describe_image_tags paginations in batch mode
+MAX_BATCH_WORKERS = 8
 
 
 # This class is very similar to the script located in
@@ -14,7 +17,7 @@ SEMANTIC_VERSION_REGEX = "([0-9]+)\.([0-9]+)\.([0-9]+)\.([0-9]+)(_RC[0-9]+)?"
 class LatestImageManager:
     """Get the latest ECR image"""
 
-    def __init__(self, orig_gitlab_name, repository_name):
+    def __init__(self, orig_gitlab_name, repository_name, client=None, cache=None, refresh=False):
         """
             Create initial configuration by connecting to public ECR.
 
@@ -24,6 +27,14 @@ class LatestImageManager:
                 Gitlab tag name created in repository
             repository_name: string
                 Location of image
+            client: ECRPublic.Client
+                Optional ecr-public client to reuse. A new validated session and client are created on the first
+                API call if not provided.
+            cache: ImageTagCache
+                Optional on-disk tag cache. Every tag is fetched from ECR when not provided.
+            refresh: bool
+                Refresh the cached tags even if they are within the cache TTL, stopping at the first page without
+                changes. See get_all_images_in_detail for what this assumes.
         """
 
         self.orig_gitlab_name = orig_gitlab_name
@@ -35,10 +46,75 @@ class LatestImageManager:
         self.beluga_major_version_num, \
         self.pcb_patch_num = self.normalize_gitlab_tag()
 
-        # ECR public only works against us-east-1
-        boto_session = utils.get_boto_session()
-        config = Config(region_name="us-east-1")
-        self.client = boto_session.client("ecr-public", config=config)
+        # Compile the release pattern once rather than once per image tag
+        self.release_pattern = regex.compile(self.regex_for_image_within_specific_release())
+
+        self._client = client
+        self.cache = cache
+        self.refresh = refresh
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self.create_client()
+        return self._client
+
+    @staticmethod
+    def create_client(max_pool_connections=None):
+        """
+          Get the shared ecr-public client of the validated process-wide boto3 session. Adaptive retries back off
+          client-side when concurrent paginations get throttled.
+        """
+        return utils.get_boto_client("ecr-public", region_name=ECR_PUBLIC_REGION,
+                                     max_pool_connections=max_pool_connections, retry_mode="adaptive")
+
+    @classmethod
+    def get_latest_images(cls, orig_gitlab_name, repository_names, max_workers=MAX_BATCH_WORKERS, cache=None,
+                          refresh=False):
+        """
+          Get the latest image for every repository within the release of the given Gitlab tag.
+
+          One validated session and client are shared by all repositories, and the describe_image_tags
+          paginations run concurrently on a bounded thread pool (boto3 clients are thread-safe).
+
+          Arguments
+          ----------
+          orig_gitlab_name: string
+              Gitlab tag name created in repository
+          repository_names: list
+              Locations of images
+          max_workers: int
+              Maximum number of repositories to query at the same time
+          cache: ImageTagCache
+              Optional on-disk tag cache shared by all repositories
+          refresh: bool
+              Refresh the cached tags even if they are within the cache TTL, stopping at the first page without
+              changes. See get_all_images_in_detail for what this assumes.
+
+          Returns
+          ----------
+          dict: repository name -> latest image tag, in the order the repositories were given
+        """
+        repository_names = list(dict.fromkeys(repository_names))
+        if len(repository_names) == 0:
+            return {}
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        max_workers = max(1, min(max_workers, len(repository_names)))
+        managers = [cls(orig_gitlab_name, repository_name, cache=cache, refresh=refresh)
+                    for repository_name in repository_names]
+
+        # Only validate a session when at least one repository has to go to ECR
+        if any(manager.needs_api_call() for manager in managers):
+            client = cls.create_client(max_pool_connections=max_workers)
+            for manager in managers:
+                manager._client = client
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            latest_images = list(executor.map(lambda manager: manager.get_latest_image(), managers))
+
+        return dict(zip(repository_names, latest_images))
 
     def regex_for_image_within_specific_release(self):
         if "RC" in self.orig_gitlab_name:
@@ -65,21 +141,27 @@ class LatestImageManager:
         # Return integers: infrastructure version | beluga major version | pcb patch num
         return [gitlab_infrastructure_version_num, gitlab_major_version_num, gitlab_pcb_patch_num]
 
-    def get_all_images_in_detail(self):
+    def needs_api_call(self):
         """
-          Get all images within ECR.
+          Return True if getting the images requires calling ECR, i.e. there is no fresh cache entry to serve from.
+        """
+        if self.cache is None or self.refresh:
+            return True
+        return not self.cache.is_fresh(self.cache.load(self.repository_name))
+
+    def get_image_tag_pages(self):
+        """
+          Yield the imageTagDetails of every describe_image_tags page within ECR, one page at a time.
 
           API Resource:
             https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ecr-public.html#ECRPublic.Client.describe_image_tags
         """
-        all_images = []
-
         # Make initial API call to get first 1000 images
         response = self.client.describe_image_tags(
             repositoryName=self.repository_name,
             maxResults=1000
         )
-        all_images += response.get('imageTagDetails')
+        yield response.get('imageTagDetails')
 
         # If there are more than 1000 images, paginate and retrieve the others
         while "nextToken" in response:
@@ -88,9 +170,79 @@ class LatestImageManager:
                 maxResults=1000,
                 nextToken=response["nextToken"]
             )
-            all_images += response.get('imageTagDetails')
+            yield response.get('imageTagDetails')
 
-        return all_images
+    def get_all_images_in_detail(self):
+        """
+          Get all images within ECR.
+
+          With a cache, a fresh cache entry is returned without any API call. A missing or expired entry is replaced
+          by a full listing, so tags deleted from ECR drop out of the cache.
+
+          With refresh, an existing entry is instead updated incrementally: pagination stops at the first page whose
+          tags are all already cached with the same pushed-at time. describe_image_tags doesn't guarantee any order,
+          so this assumes newly pushed tags show up on the pages before that one. A tag on a later page is missed
+          until the entry expires, and deleted tags are kept until then. Release tooling should use no cache instead.
+        """
+        if self.cache is None:
+            return [image for page in self.get_image_tag_pages() for image in page]
+
+        entry = self.cache.load(self.repository_name)
+        if not self.refresh and self.cache.is_fresh(entry):
+            return self.cached_images(entry["tags"])
+
+        cached_tags = entry["tags"] if self.refresh and entry is not None else {}
+        tags = dict(cached_tags)
+        for page in self.get_image_tag_pages():
+            page_has_new_tags = False
+            for image in page:
+                image_tag = image.get('imageTag')
+                if image_tag is None:
+                    continue
+
+                pushed_at = image.get('imageDetail', {}).get('imagePushedAt')
+                pushed_at = pushed_at.timestamp() if pushed_at is not None else None
+                if cached_tags.get(image_tag, -1) != pushed_at:
+                    page_has_new_tags = True
+                tags[image_tag] = pushed_at
+
+            if cached_tags and not page_has_new_tags:
+                break
+
+        self.cache.save(self.repository_name, tags)
+        return self.cached_images(tags)
+
+    def get_all_image_tags(self):
+        """
+          Yield the tag name of every image within ECR without holding more than one page of details in memory.
+        """
+        # The cache already holds every tag of the repository in memory
+        pages = [self.get_all_images_in_detail()] if self.cache is not None else self.get_image_tag_pages()
+
+        for page in pages:
+            for image in page:
+                image_tag = image.get('imageTag')
+                if image_tag is not None:
+                    yield image_tag
+
+    @staticmethod
+    def version_key(image_tag_match):
+        """
+          Return a sortable integer tuple for a release pattern match. A final image ranks above its release
+          candidates, and release candidates are ordered by RC number (same ordering as PEP 440 versions).
+        """
+        version = tuple(int(num) for num in image_tag_match.group(1, 2, 3, 4))
+        rc_num = image_tag_match.group(6)
+        if rc_num is None:
+            return version + (1, 0)
+        return version + (0, int(rc_num))
+
+    @staticmethod
+    def cached_images(tags):
+        """
+          Convert cached {tag name: pushed-at} pairs into imageTagDetails-like dicts.
+        """
+        return [{'imageTag': image_tag, 'imagePushedAt': pushed_at} for image_tag, pushed_at in tags.items()]
 
     def get_latest_image(self):
         """
@@ -98,30 +250,65 @@ class LatestImageManager:
           and pcb_patch_num if RC tag
           Return the most recent image for the given product.
         """
-        all_images_within_release = []
-        for image in self.get_all_images_in_detail():
-            orig_image_tag_name = image.get('imageTag')
+        latest_image_tag_name = None
+        latest_version_key = None
 
-            if orig_image_tag_name is not None:
-                image_tag_name = regex.search(self.regex_for_image_within_specific_release(), orig_image_tag_name)
+        # Keep a running maximum rather than collecting and sorting every candidate. The highest is considered as
+        # the most recent.
+        search = self.release_pattern.search
+        for orig_image_tag_name in self.get_all_image_tags():
+            image_tag_name = search(orig_image_tag_name)
 
-                if image_tag_name is not None:
-                    all_images_within_release.append(orig_image_tag_name)
+            if image_tag_name is not None:
+                version_key = self.version_key(image_tag_name)
+                if latest_version_key is None or version_key > latest_version_key:
+                    latest_image_tag_name = orig_image_tag_name
+                    latest_version_key = version_key
 
-        if len(all_images_within_release) == 0:
+        if latest_image_tag_name is None:
             raise Exception(
                 f"No image was found within {self.infrastructure_version_num}.{self.beluga_major_version_num}.{self.pcb_patch_num} release")
 
-        # Sort candidates by highest to lowest. The highest is considered as the most recent.
-        sorted_images = sorted(all_images_within_release, key=parse_version, reverse=True)
+        # This is the latest candidate within the release.
+        return latest_image_tag_name
+
 
-        # Return the first item from the list. This is the latest candidate within the release.
-        return sorted_images[0]
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Print the latest ECR image tag within the release of a Gitlab tag.",
+        usage="%(prog)s REPOSITORY GITLAB_TAG\n"
+              "       %(prog)s --batch GITLAB_TAG REPOSITORY [REPOSITORY ...]"
+    )
+    parser.add_argument("--batch", metavar="GITLAB_TAG",
+                        help="resolve every given repository against GITLAB_TAG in one process and "
+                             "print one 'REPOSITORY TAG' line per repository")
+    parser.add_argument("--max-workers", type=int, default=MAX_BATCH_WORKERS,
+                        help=f"maximum concurrent repository lookups in batch mode (default: {MAX_BATCH_WORKERS})")
+    parser.add_argument("--refresh", action="store_true",
+                        help="refresh the cached image tags even if they are within the cache TTL, stopping at the "
+                             "first unchanged page; this can miss a new tag that ECR returns on a later page")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither read nor write the image tag cache and fetch every tag from ECR")
+    parser.add_argument("args", nargs="+", metavar="ARG")
+
+    args = parser.parse_args()
+    if args.batch is None and len(args.args) != 2:
+        parser.error("expected REPOSITORY GITLAB_TAG")
+
+    return args
 
 
 if __name__ == '__main__':
-    repo_name = sys.argv[1]
-    tag = sys.argv[2]
+    args = parse_args()
+    tag_cache = None if args.no_cache else ImageTagCache()
+
+    if args.batch is not None:
+        latest_images = LatestImageManager.get_latest_images(args.batch, args.args, max_workers=args.max_workers,
+                                                             cache=tag_cache, refresh=args.refresh)
+        for repo_name, latest_image in latest_images.items():
+            print(f"{repo_name} {latest_image}")
+    else:
+        repo_name, tag = args.args
 
-    lim = LatestImageManager(tag, repo_name)
-    print(lim.get_latest_image())
+        lim = LatestImageManager(tag, repo_name, cache=tag_cache, refresh=args.refresh)
+        print(lim.get_latest_image())
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import time
+from urllib.parse import quote
+
+import utils
+
+# Constants
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ping-cloud-base", "ecr-image-tags")
+DEFAULT_TTL_SECONDS = 15 * 60
+CACHE_FORMAT_VERSION = 1
+
+
+class ImageTagCache:
+    """On-disk cache of ECR image tags and their pushed-at timestamps, keyed by repository"""
+
+    def __init__(self, cache_dir=None, ttl_seconds=None):
+        """
+        Args:
+            cache_dir (string): Directory holding one cache file per repository. Defaults to the
+                IMAGE_TAG_CACHE_DIR environment variable, then ~/.cache/ping-cloud-base/ecr-image-tags
+            ttl_seconds (int): Age in seconds after which a cached repository must be refreshed. Defaults to
+                the IMAGE_TAG_CACHE_TTL_SECONDS environment variable, then 15 minutes
+        """
+        self.cache_dir = cache_dir or os.environ.get("IMAGE_TAG_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if ttl_seconds is None:
+            ttl_seconds = int(os.environ.get("IMAGE_TAG_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.ttl_seconds = ttl_seconds
+
+    def get_cache_file(self, repository_name) -> str:
+        """
+        Args:
+            repository_name (string): ECR repository name, e.g. pingcloud-apps/pingfederate
+
+        Returns:
+            string: path of the cache file for the repository
+        """
+        return os.path.join(self.cache_dir, f"{quote(repository_name, safe='')}.json")
+
+    def load(self, repository_name) -> dict:
+        """
+        Args:
+            repository_name (string): ECR repository name
+
+        Returns:
+            dict: {"fetched_at": epoch seconds, "tags": {tag name: pushed-at epoch seconds}}, or None if the
+            repository isn't cached or the cache file can't be read
+        """
+        try:
+            with open(self.get_cache_file(repository_name)) as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("version") != CACHE_FORMAT_VERSION or entry.get("repository") != repository_name:
+            return None
+
+        return entry
+
+    def is_fresh(self, entry) -> bool:
+        """
+        Args:
+            entry (dict): cache entry returned by load
+
+        Returns:
+            bool: True if the entry was fetched within the TTL, False otherwise
+        """
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    def save(self, repository_name, tags) -> None:
+        """
+        Atomically write the tags of a repository to its cache file. Failures are logged and ignored since the
+        cache is only an optimization.
+
+        Args:
+            repository_name (string): ECR repository name
+            tags (dict): {tag name: pushed-at epoch seconds}
+        """
+        entry = {
+            "version": CACHE_FORMAT_VERSION,
+            "repository": repository_name,
+            "fetched_at": time.time(),
+            "tags": tags,
+        }
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as tmp_file:
+                    json.dump(entry, tmp_file)
+                os.replace(tmp_path, self.get_cache_file(repository_name))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            utils.logger.warning(f"Unable to write image tag cache for {repository_name}: {e}")
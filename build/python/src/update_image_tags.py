@@ -0,0 +1,179 @@
+import argparse
+import difflib
+import os
+import re as regex
+import sys
+
+# Constants
+ECR_REGISTRY = "public.ecr.aws/r2h3l6e4/"
+ENV_VAR_SUFFIX = "_IMAGE_TAG"
+DEFAULT_PATHS = ["k8s-configs", "code-gen/templates"]
+
+# One pattern covers every image and every env var, so each file is scanned exactly once regardless of the number
+# of images. Matches are dispatched to their image through a dict lookup on the captured repository or variable name.
+SUBSTITUTION_REGEX = regex.compile(
+    rf"{regex.escape(ECR_REGISTRY)}(?P<repository>[^\s:'\"]+)/dev:(?P<tag>[^\s'\"]*)"
+    rf"|^(?P<env_var>[A-Z0-9_]+{ENV_VAR_SUFFIX})=(?P<value>.*)$",
+    regex.MULTILINE
+)
+
+
+def image_tag_var(repository_name) -> str:
+    """
+    Args:
+        repository_name (string): ECR repository name, e.g. pingcloud-apps/pingaccess-was
+
+    Returns:
+        string: the env var holding the image tag, e.g. PINGACCESS_WAS_IMAGE_TAG (same as tag-release.sh)
+    """
+    image = repository_name.rsplit("/", 1)[-1]
+    return f"{image.replace('-', '_').upper()}{ENV_VAR_SUFFIX}"
+
+
+def read_image_tags(lines) -> dict:
+    """
+    Args:
+        lines (iterable): 'REPOSITORY TAG' lines, as printed by get_latest_image.py --batch
+
+    Returns:
+        dict: repository name -> target image tag
+    """
+    image_tags = {}
+    for line in lines:
+        line = line.strip()
+        if line:
+            repository_name, target_tag = line.split()
+            image_tags[repository_name] = target_tag
+    return image_tags
+
+
+class ImageTagRewriter:
+    """Rewrite the image tags of several images across the repo in a single pass"""
+
+    def __init__(self, image_tags, source_value, ref_type):
+        """
+        Args:
+            image_tags (dict): repository name -> target image tag
+            source_value (string): current image tag to replace, e.g. v1.18-release-branch-latest
+            ref_type (string): 'tag' also moves the images from the dev to the prod ECR path, 'branch' doesn't
+        """
+        self.image_tags = image_tags
+        self.env_var_tags = {image_tag_var(repository_name): tag for repository_name, tag in image_tags.items()}
+        self.source_value = source_value
+        self.to_prod = ref_type == "tag"
+
+    def substitute(self, match) -> str:
+        if match.group("env_var") is not None:
+            # Same as grep_var: only replace an exact source value
+            target_tag = self.env_var_tags.get(match.group("env_var"))
+            if target_tag is None or match.group("value") != self.source_value:
+                return match.group(0)
+            return f"{match.group('env_var')}={target_tag}"
+
+        repository_name = match.group("repository")
+        target_tag = self.image_tags.get(repository_name)
+        if target_tag is None:
+            return match.group(0)
+
+        # Same as grep_yaml: replace the source tag, and drop the dev path from all of the image's references
+        tag = target_tag if match.group("tag") == self.source_value else match.group("tag")
+        dev_path = "" if self.to_prod else "/dev"
+        return f"{ECR_REGISTRY}{repository_name}{dev_path}:{tag}"
+
+    def rewrite(self, text) -> str:
+        return SUBSTITUTION_REGEX.sub(self.substitute, text)
+
+    def rewrite_tree(self, root_dir, paths=None, dry_run=False) -> list:
+        """
+        Walk the given paths once and rewrite every file whose content changes.
+
+        Args:
+            root_dir (string): Root directory of the repo
+            paths (list): files or directories relative to root_dir. Defaults to k8s-configs and code-gen/templates
+            dry_run (bool): print a diff summary instead of writing the files
+
+        Returns:
+            list: relative paths of the files that changed
+        """
+        changed_files = []
+        for file_path in self.walk(root_dir, paths or DEFAULT_PATHS):
+            try:
+                with open(file_path, encoding="utf-8") as f:
+                    text = f.read()
+            except (UnicodeDecodeError, OSError):
+                continue
+
+            # Cheap pre-filter before running the pattern
+            if ECR_REGISTRY not in text and ENV_VAR_SUFFIX not in text:
+                continue
+
+            new_text = self.rewrite(text)
+            if new_text == text:
+                continue
+
+            relative_path = os.path.relpath(file_path, root_dir)
+            changed_files.append(relative_path)
+
+            if dry_run:
+                print_diff_summary(relative_path, text, new_text)
+            else:
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(new_text)
+
+        return changed_files
+
+    @staticmethod
+    def walk(root_dir, paths):
+        for path in paths:
+            path = os.path.join(root_dir, path)
+            if os.path.isfile(path):
+                yield path
+                continue
+
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names[:] = [dir_name for dir_name in dir_names if dir_name != ".git"]
+                for file_name in file_names:
+                    yield os.path.join(dir_path, file_name)
+
+
+def print_diff_summary(relative_path, text, new_text) -> None:
+    diff = [
+        line.rstrip("\n") for line in difflib.unified_diff(text.splitlines(True), new_text.splitlines(True), n=0)
+        if line[:1] in "-+" and not line.startswith(("---", "+++"))
+    ]
+    print(f"{relative_path}: {len(diff) // 2} line(s) changed")
+    for line in diff:
+        print(f"  {line}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replace the image tags of every image in k8s yaml and env var files in a single pass."
+    )
+    parser.add_argument("--source-value", required=True, help="current image tag to replace")
+    parser.add_argument("--ref-type", required=True, choices=["tag", "branch"],
+                        help="'tag' also moves images from the dev to the prod ECR path")
+    parser.add_argument("--image-tags", default="-",
+                        help="file of 'REPOSITORY TAG' lines as printed by get_latest_image.py --batch "
+                             "(default: stdin)")
+    parser.add_argument("--dry-run", action="store_true", help="print a diff summary without writing any file")
+    parser.add_argument("root_dir", help="root directory of the ping-cloud-base repo")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS,
+                        help=f"files or directories relative to root_dir (default: {' '.join(DEFAULT_PATHS)})")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if args.image_tags == "-":
+        image_tags = read_image_tags(sys.stdin)
+    else:
+        with open(args.image_tags) as image_tags_file:
+            image_tags = read_image_tags(image_tags_file)
+
+    rewriter = ImageTagRewriter(image_tags, args.source_value, args.ref_type)
+    changed_files = rewriter.rewrite_tree(args.root_dir, args.paths, dry_run=args.dry_run)
+
+    action = "Would change" if args.dry_run else "Changed"
+    print(f"{action} {len(changed_files)} file(s)")
@@ -1,7 +1,15 @@
+import atexit
+import json
 import logging
+import math
 import os
 import sys
-import boto3
+import threading
+import time
+from datetime import datetime, timezone
+
+# boto3 and botocore are imported on first use: they dominate the startup time of these short-lived scripts and
+# aren't needed at all when a lookup is served from a cache
 
 
 def set_up_logger(name):
@@ -18,6 +26,136 @@ def set_up_logger(name):
 
 logger = set_up_logger(__name__)
 
+# Process-wide boto3 session, caller identity and clients shared by all callers (e.g. concurrent batch lookups)
+_boto_lock = threading.Lock()
+_boto_session = None
+_caller_identity = None
+_caller_identity_expiry = None
+_boto_clients = {}
+_api_metrics = None
+
+# Opt-in AWS API metrics: set to the file the JSON summary should be written to at exit
+API_METRICS_FILE_ENV_VAR = "AWS_API_METRICS_FILE"
+
+
+class ApiMetrics:
+    """Record per-operation AWS API call metrics through botocore's event system"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+
+    def register(self, boto_session) -> None:
+        """
+        Args:
+            boto_session (boto3 Session): session whose clients should be instrumented
+        """
+        boto_session.events.register("before-call", self.before_call)
+        boto_session.events.register("after-call", self.after_call)
+        boto_session.events.register("after-call-error", self.after_call_error)
+
+    def before_call(self, model, context, **kwargs) -> None:
+        context["api_metrics_operation"] = f"{model.service_model.service_name}.{model.name}"
+        context["api_metrics_start"] = time.perf_counter()
+
+    def after_call(self, http_response, parsed, context, **kwargs) -> None:
+        # The body of streaming operations (e.g. s3.GetObject) hasn't been read yet, and reading it here would consume
+        # it, so the payload size comes from Content-Length. Responses without one (chunked) count as 0 bytes.
+        try:
+            payload_bytes = int(http_response.headers.get("Content-Length", 0))
+        except (AttributeError, ValueError):
+            payload_bytes = 0
+        retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        self.record(context, retries=retries, payload_bytes=payload_bytes, error=False)
+
+    def after_call_error(self, context, **kwargs) -> None:
+        self.record(context, retries=0, payload_bytes=0, error=True)
+
+    def record(self, context, retries, payload_bytes, error) -> None:
+        start = context.get("api_metrics_start")
+        if start is None:
+            return
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        name = context["api_metrics_operation"]
+        logger.debug(f"{name} took {latency_ms:.1f} ms, {payload_bytes} bytes, {retries} retries")
+
+        with self.lock:
+            operation = self.operations.setdefault(
+                name, {"latencies_ms": [], "retries": 0, "payload_bytes": 0, "errors": 0}
+            )
+            # Every call is one page for paginated operations
+            operation["latencies_ms"].append(latency_ms)
+            operation["retries"] += retries
+            operation["payload_bytes"] += payload_bytes
+            operation["errors"] += int(error)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: {"service.Operation": {"calls", "retries", "errors", "payload_bytes", "p50_ms", "p95_ms",
+            "max_ms", "total_ms"}}
+        """
+        with self.lock:
+            operations = {name: dict(operation) for name, operation in self.operations.items()}
+
+        summary = {}
+        for name, operation in sorted(operations.items()):
+            latencies = sorted(operation["latencies_ms"])
+            summary[name] = {
+                "calls": len(latencies),
+                "retries": operation["retries"],
+                "errors": operation["errors"],
+                "payload_bytes": operation["payload_bytes"],
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "max_ms": round(latencies[-1], 3),
+                "total_ms": round(sum(latencies), 3),
+            }
+        return summary
+
+    def write_summary(self, file_path) -> None:
+        """
+        Args:
+            file_path (string): file to write the JSON summary to
+        """
+        try:
+            with open(file_path, "w") as summary_file:
+                json.dump({"pid": os.getpid(), "argv": sys.argv, "operations": self.summary()}, summary_file,
+                          indent=2)
+        except OSError as e:
+            logger.warning(f"Unable to write AWS API metrics to {file_path}: {e}")
+
+
+def percentile(sorted_values, percent) -> float:
+    """
+    Args:
+        sorted_values (list): values in ascending order
+        percent (int): percentile to get, from 0 to 100
+
+    Returns:
+        float: nearest-rank percentile of the values
+    """
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def get_api_metrics():
+    """
+    Returns:
+        ApiMetrics: The process-wide metrics if enabled through the AWS_API_METRICS_FILE environment variable,
+        None otherwise. The summary is written to that file at exit.
+    """
+    global _api_metrics
+
+    if _api_metrics is None:
+        metrics_file = os.environ.get(API_METRICS_FILE_ENV_VAR)
+        if metrics_file:
+            _api_metrics = ApiMetrics()
+            atexit.register(_api_metrics.write_summary, metrics_file)
+
+    return _api_metrics
+
 
 def get_branch(root_dir) -> str:
     """
@@ -33,20 +171,110 @@ def get_branch(root_dir) -> str:
         return os.environ.get("CI_COMMIT_REF_NAME")
 
 
-def get_boto_session() -> boto3.session.Session:
+def get_boto_session() -> "boto3.session.Session":
     """
     Gets a boto3 session depending on whether we are running in a local
     environment or in Gitlab. Validates the session before returning it.
 
+    The session is created once per process and the caller identity from
+    validating it is reused until the session credentials expire.
+
     Returns:
         boto3 session: A valid boto3 session for the environment (gitlab or local)
     """
-    session = boto3.session.Session()
-    check_boto_session(session)
-    return session
+    global _boto_session, _caller_identity, _caller_identity_expiry
+
+    with _boto_lock:
+        if _boto_session is None:
+            import boto3
+
+            _boto_session = boto3.session.Session()
+
+            api_metrics = get_api_metrics()
+            if api_metrics is not None:
+                api_metrics.register(_boto_session)
+
+        if _caller_identity is None or credentials_expired(_caller_identity_expiry):
+            _caller_identity = check_boto_session(_boto_session)
+            _caller_identity_expiry = get_credentials_expiry(_boto_session)
+
+        return _boto_session
+
+
+def get_boto_client(service_name, region_name=None, max_pool_connections=None, retry_mode=None,
+                    max_attempts=None):
+    """
+    Gets a boto3 client from the validated process-wide session. Clients are
+    created once per service, region and configuration and then shared, so
+    repeated and concurrent callers reuse the client's connection pool.
+
+    Args:
+        service_name (string): AWS service, e.g. ecr-public
+        region_name (string): AWS region, defaults to the session region
+        max_pool_connections (int): maximum connections kept in the client's pool
+        retry_mode (string): botocore retry mode, e.g. standard or adaptive
+        max_attempts (int): maximum attempts per call, including the first one
+
+    Returns:
+        boto3 client: A client for the service
+    """
+    from botocore.config import Config
+
+    session = get_boto_session()
+    key = (service_name, region_name, max_pool_connections, retry_mode, max_attempts)
+
+    with _boto_lock:
+        client = _boto_clients.get(key)
+        if client is None:
+            config_args = {"region_name": region_name}
+            if max_pool_connections is not None:
+                config_args["max_pool_connections"] = max_pool_connections
+            if retry_mode is not None or max_attempts is not None:
+                config_args["retries"] = {
+                    name: value for name, value in (("mode", retry_mode), ("max_attempts", max_attempts))
+                    if value is not None
+                }
+
+            # Sessions aren't thread-safe, so clients are only ever created under the lock
+            client = session.client(service_name, config=Config(**config_args))
+            _boto_clients[key] = client
+
+        return client
+
+
+def get_caller_identity() -> dict:
+    """
+    Returns:
+        dict: The cached STS caller identity of the validated process-wide session
+    """
+    get_boto_session()
+    return _caller_identity
+
+
+def get_credentials_expiry(boto_session):
+    """
+    Args:
+        boto_session (boto3 Session): session to get the credentials expiry of
+
+    Returns:
+        datetime: When the session credentials expire, or None if they don't (e.g. static keys)
+    """
+    credentials = boto_session.get_credentials()
+    return getattr(credentials, "_expiry_time", None)
+
+
+def credentials_expired(expiry) -> bool:
+    """
+    Args:
+        expiry (datetime): credentials expiry, None if they never expire
+
+    Returns:
+        True if the expiry has passed, False otherwise
+    """
+    return expiry is not None and datetime.now(timezone.utc) >= expiry
 
 
-def check_boto_session(boto_session) -> None:
+def check_boto_session(boto_session) -> dict:
     """
     Checks validity of a boto3 session
 
@@ -54,11 +282,11 @@ def check_boto_session(boto_session) -> None:
         boto_session (boto3 Session): session to check the validity of
 
     Returns:
-        Exits non-zero if a non valid session, otherwise nothing returned.
+        Exits non-zero if a non valid session, otherwise the STS caller identity is returned.
     """
 
     try:
-        boto_session.client("sts").get_caller_identity()
+        return boto_session.client("sts").get_caller_identity()
     except Exception as e:
         logger.exception(f"AWS boto encountered an exception: {e}")
         sys.exit(1)
@@ -68,27 +68,39 @@ replace_and_commit() {
     "sigsci-agent"
   )
 
+  local image_repos=()
+  local image_tags_file
+
   for image in ${image_map[@]}; do
-    image_tag_var="$(echo "${image}" | tr '-' '_' | tr '[:lower:]' '[:upper:]')_IMAGE_TAG"
-    image_repo=$(get_image_repo ${image} | xargs)
+    image_repos+=("$(get_image_repo ${image} | xargs)/${image}")
+  done
+
+  image_tags_file=$(mktemp)
 
-    echo ---
-    echo "Changing values for ${image_repo}/${image} in expected files"
+  if test "${ref_value}" = 'tag'; then
+    # If tag, search registry for the latest version of every image in a single batch lookup. Releases skip the
+    # image tag cache so every tag in the registry is considered.
+    python3 "${PWD_DIR}"/python/src/get_latest_image.py --batch "${target_value}" --no-cache "${image_repos[@]}" \
+      > "${image_tags_file}"
+  else
+    # If branch, use target value
+    for image_repo in "${image_repos[@]}"; do
+      echo "${image_repo} ${target_value}"
+    done > "${image_tags_file}"
+  fi
 
-    if test "${ref_value}" = 'tag'; then
-      # If tag, search registry for latest image version
-      target_image=$(python3 "${PWD_DIR}"/python/src/get_latest_image.py "${image_repo}/${image}" ${target_value})
-    else
-      # If branch, use target value
-      target_image="${target_value}"
-    fi
+  echo ---
+  echo "Changing ${source_value} -> target image tags in base env vars and k8s yaml files:"
+  cat "${image_tags_file}"
 
-    # update base env vars
-    grep_var "${image_tag_var}" "${source_value}" "${target_image}"
+  # Update base env vars and k8s yaml files for all images in a single pass over the tree
+  python3 "${PWD_DIR}"/python/src/update_image_tags.py \
+    --source-value "${source_value}" \
+    --ref-type "${ref_value}" \
+    --image-tags "${image_tags_file}" \
+    "${SANDBOX}"/ping-cloud-base
 
-    # update k8s yaml files
-    grep_yaml "${image}" "${source_value}" "${target_image}" "${ref_value}"
-  done
+  rm -f "${image_tags_file}"
 
 # Getting source and tagret branch for dashboards repo. Current development release branch becomes $release-dev-branch
 # and current tag becomes $release-release-branch. E.g. v1.17-release-branch becomes v1.17-dev-branch and v1.17.0 becomes
@@ -122,27 +134,6 @@ grep_var() {
   git grep -l "^${var}=${source_value}" | xargs sed -i.bak "s/^\(${var}=\)${source_value}$/\1${target_value}/g"
 }
 
-grep_yaml() {
-  local var=${1}
-  local source_value=${2}
-  local target_value=${3}
-  local ref_value=${4}
-
-  local dev_ecr_path="image: public.ecr.aws/r2h3l6e4/.*/${var}/dev"
-
-  echo "Changing ${var}:${source_value} -> ${var}:${target_value} in k8s yaml files"
-
-  cd "${SANDBOX}"/ping-cloud-base/k8s-configs
-  git grep -l "${dev_ecr_path}:${source_value}" | xargs sed -i.bak "s/${var}\/dev:${source_value}/${var}\/dev:${target_value}/g"
-
-  if test "${ref_value}" = 'tag'; then
-    # update the ecr path to prod from dev
-    git grep -l "${dev_ecr_path}" | xargs sed -i.bak "s/${var}\/dev:/${var}:/g"
-  fi
-
-  cd "${SANDBOX}"/ping-cloud-base/
-}
-
 ########################################################################################################################
 # Performs a 'grep' on each file within the repo searching for dev image paths.
 #
@@ -6,7 +6,6 @@ import pathlib
 import subprocess
 import time
 import json
-import inquirer
 from oauthlib.oauth2 import BackendApplicationClient, InvalidClientError
 from requests import Response
 from requests.auth import HTTPBasicAuth
@@ -407,6 +406,9 @@ class PingOneSetup:
 
 
 def interactive_execution():
+    # Only needed for prompts, so cluster_execution doesn't pay for importing it
+    import inquirer
+
     # Check that all required env vars are set
     if any(env_var not in os.environ for env_var in BASE_REQUIRED_ENV_VARS):
         print("Error... Required Environment Variables are not set")
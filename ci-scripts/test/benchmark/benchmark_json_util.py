@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "k8s-configs",
+                                "cluster-tools", "base", "git-ops", "validation"))
+
+from json_util import get_json_syntax_errors
+
+# Constants
+STRING_LENGTHS = [24, 60, 100000]
+MAX_SECONDS = 1.0
+
+# Scenarios: name -> (function returning the file content for the given length, whether it's malformed)
+SCENARIOS = {
+    "unterminated": (lambda length: '{"a": "' + "x" * length, True),
+    "raw-tab": (lambda length: '{"a": "' + "x" * length + '\t"}', True),
+    "raw-newline": (lambda length: '{"a": "' + "x" * length + '\n"}', True),
+    "bad-escape": (lambda length: '{"a": "' + "x\\n" * (length // 3) + '\\q"}', True),
+    "trailing-spaces": (lambda length: '{"a": 1}' + " " * length, False),
+    "crlf-padded": (lambda length: '{\r\n  "a": 1\r\n}' + "\r\n" * length, False),
+}
+
+
+def measure(file_path, streaming) -> dict:
+    start = time.perf_counter()
+    errors = get_json_syntax_errors(file_path, streaming=streaming)
+    return {"errors": errors, "wall_seconds": round(time.perf_counter() - start, 4)}
+
+
+def run_scenarios(length) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for scenario, (make_content, malformed) in SCENARIOS.items():
+            file_path = os.path.join(temp_dir, f"{scenario}.json")
+            with open(file_path, "w") as json_file:
+                json_file.write(make_content(length))
+
+            for streaming in (False, True):
+                result = measure(file_path, streaming)
+                result.update(scenario=scenario, length=length, streaming=streaming, malformed=malformed)
+                results.append(result)
+    return results
+
+
+def check_results(results, max_seconds) -> list:
+    failures = []
+    for result in results:
+        name = f"{result['scenario']} {result['length']} chars{' streaming' if result['streaming'] else ''}"
+        if result["malformed"] and not result["errors"]:
+            failures.append(f"{name}: malformed string not reported")
+        if not result["malformed"] and result["errors"]:
+            failures.append(f"{name}: valid file reported as {result['errors'][0][1]}")
+        if result["wall_seconds"] > max_seconds:
+            failures.append(f"{name}: took {result['wall_seconds']}s, over the {max_seconds}s budget")
+    return failures
+
+
+def print_results(results) -> None:
+    print(f"{'scenario':<16} {'length':>7} {'streaming':>9} {'wall s':>8}  error")
+    for result in results:
+        error = result["errors"][0][1] if result["errors"] else "-"
+        print(f"{result['scenario']:<16} {result['length']:>7} {str(result['streaming']):>9} "
+              f"{result['wall_seconds']:>8}  {error}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Check that json_util reports malformed strings and accepts whitespace-padded files in bounded "
+                    "time, with and without streaming."
+    )
+    parser.add_argument("--lengths", type=int, nargs="+", default=STRING_LENGTHS,
+                        help="malformed string and whitespace padding lengths "
+                             f"(default: {' '.join(map(str, STRING_LENGTHS))})")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS,
+                        help=f"fail if a file takes longer than this to check (default: {MAX_SECONDS})")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON to FILE")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    all_results = [result for length in args.lengths for result in run_scenarios(length)]
+    print_results(all_results)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(all_results, json_file, indent=2)
+
+    all_failures = check_results(all_results, args.max_seconds)
+    for failure in all_failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if all_failures else 0)
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-utils"))
+
+import kubernetes as k8s
+
+import k8s_utils
+from fake_kube_api import CLUSTER_SIZES, HEALTH_CRON_JOBS, JOB_SECONDS, FakeKubeApi
+from k8s_utils import K8sUtils
+
+# Constants
+JOB_NAME = HEALTH_CRON_JOBS[0]
+PING_CLOUD_NAMESPACE = "ping-cloud"
+PINGDIRECTORY_POD_PATTERN = r"pingdirectory-\d+"
+
+
+def connect(api_url: str):
+    """Point the shared K8sUtils clients at the fake API server and drop the state left by a previous cluster"""
+    configuration = k8s.client.Configuration()
+    configuration.host = api_url
+    api_client = k8s.client.ApiClient(configuration)
+    K8sUtils.batch_client = k8s.client.BatchV1Api(api_client)
+    K8sUtils.core_client = k8s.client.CoreV1Api(api_client)
+    K8sUtils.network_client = k8s.client.NetworkingV1Api(api_client)
+    K8sUtils.snapshots = {}
+    k8s_utils.ingress_indexes.clear()
+
+
+def measure(operation, fake_api) -> dict:
+    """
+    Run an operation once for wall time and API requests. Watch requests are counted separately since snapshot
+    watches are started in the background and may be counted against the next operation.
+    """
+    calls_before = fake_api.calls.copy()
+    start = time.perf_counter()
+    value = operation()
+    wall_seconds = time.perf_counter() - start
+    calls = fake_api.calls - calls_before
+
+    return {
+        "value": value,
+        "wall_seconds": round(wall_seconds, 4),
+        "api_calls": sum(count for call, count in calls.items() if not call.startswith("watch ")),
+        "watch_calls": sum(count for call, count in calls.items() if call.startswith("watch ")),
+    }
+
+
+def run_scenarios(pod_count, job_seconds) -> list:
+    fake_api = FakeKubeApi(job_seconds)
+    fake_api.seed(pod_count)
+    connect(fake_api.start())
+    k8s_utils_instance = K8sUtils()
+    results = []
+
+    def run(scenario, operation, expected_value, expected_api_calls, min_seconds=0.0):
+        result = measure(operation, fake_api)
+        result.update(scenario=scenario, pods=pod_count, expected_value=expected_value,
+                      expected_api_calls=expected_api_calls, min_seconds=min_seconds)
+        results.append(result)
+        return result
+
+    try:
+        # The first lookup lists the ingresses, later ones are answered from the ingress host index
+        for scenario, expected_calls in [("get_endpoint-cold", 1), ("get_endpoint-warm", 0)]:
+            run(scenario, lambda: K8sUtils.get_endpoint("healthcheck"), "http://healthcheck.ping-demo.com",
+                expected_calls)
+
+        # The first lookup lists the pods into the shared snapshot, later ones are answered from memory
+        expected_pod_names = ["pingdirectory-0", "pingdirectory-1", "pingdirectory-2"]
+        for scenario, expected_calls in [("pod_names-cold", 1), ("pod_names-warm", 0)]:
+            run(scenario, lambda: sorted(k8s_utils_instance.get_namespaced_pod_names(
+                PING_CLOUD_NAMESPACE, PINGDIRECTORY_POD_PATTERN)), expected_pod_names, expected_calls)
+
+        # run_job lists the cron jobs the first time, then creates the job and waits for its pod: one list, one watch
+        for scenario, expected_calls in [("run_job-cold", 3), ("run_job-warm", 2)]:
+            run(scenario, lambda: K8sUtils.run_job(JOB_NAME).metadata.name.startswith(f"{JOB_NAME}-test-"), True,
+                expected_calls, job_seconds)
+
+        # Waiting on a job that already completed only lists its pod
+        job = K8sUtils.create_job(JOB_NAME)
+        run("wait_for_job-running", lambda: K8sUtils.wait_for_job_complete(
+            job.metadata.name, job.metadata.namespace)[0].status.phase, "Succeeded", 1)
+        run("wait_for_job-done", lambda: K8sUtils.wait_for_job_complete(
+            job.metadata.name, job.metadata.namespace)[0].status.phase, "Succeeded", 1)
+    finally:
+        fake_api.stop()
+
+    return results
+
+
+def check_results(results, max_seconds_per_10k_pods) -> list:
+    failures = []
+    for result in results:
+        name = f"{result['scenario']} {result['pods']} pods"
+        if result["value"] != result["expected_value"]:
+            failures.append(f"{name}: got {result['value']}, expected {result['expected_value']}")
+        if result["api_calls"] > result["expected_api_calls"]:
+            failures.append(f"{name}: {result['api_calls']} API calls, expected at most {result['expected_api_calls']}")
+        # Waiting for a job can't be faster than the job, so only the time on top of the job counts
+        if max_seconds_per_10k_pods is not None and \
+                result["wall_seconds"] - result["min_seconds"] > max_seconds_per_10k_pods * max(1.0, result["pods"] / 10000):
+            failures.append(f"{name}: took {result['wall_seconds']}s, over the "
+                            f"{max_seconds_per_10k_pods}s per 10k pods budget")
+    return failures
+
+
+def print_results(results) -> None:
+    print(f"{'scenario':<22} {'pods':>7} {'wall s':>8} {'API calls':>9} {'watches':>7}")
+    for result in results:
+        print(f"{result['scenario']:<22} {result['pods']:>7} {result['wall_seconds']:>8} {result['api_calls']:>9} "
+              f"{result['watch_calls']:>7}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the K8sUtils test helpers against an in-process Kubernetes API stand-in."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=CLUSTER_SIZES,
+                        help=f"synthetic cluster sizes in pods (default: {' '.join(map(str, CLUSTER_SIZES))})")
+    parser.add_argument("--job-seconds", type=float, default=JOB_SECONDS,
+                        help=f"seconds a created job runs before its pod succeeds (default: {JOB_SECONDS})")
+    parser.add_argument("--max-seconds-per-10k-pods", type=float,
+                        help="fail if a helper takes longer than this per 10k pods, on top of the job run time")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON to FILE")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    all_results = [result for size in args.sizes for result in run_scenarios(size, args.job_seconds)]
+    print_results(all_results)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(all_results, json_file, indent=2)
+
+    all_failures = check_results(all_results, args.max_seconds_per_10k_pods)
+    for failure in all_failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if all_failures else 0)
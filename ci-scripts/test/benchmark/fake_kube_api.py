@@ -0,0 +1,382 @@
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Synthetic cluster sizes (pods) and the seconds a created job runs before its pod succeeds
+CLUSTER_SIZES = [100, 1000, 10000]
+JOB_SECONDS = 0.5
+
+# URL path resource name -> (API group path, kind)
+RESOURCES = {
+    "pods": ("/api/v1", "Pod"),
+    "namespaces": ("/api/v1", "Namespace"),
+    "jobs": ("/apis/batch/v1", "Job"),
+    "cronjobs": ("/apis/batch/v1", "CronJob"),
+    "ingresses": ("/apis/networking.k8s.io/v1", "Ingress"),
+}
+HEALTH_CRON_JOBS = [
+    "healthcheck-cluster-health",
+    "healthcheck-pingaccess",
+    "healthcheck-pingaccess-was",
+    "healthcheck-pingdirectory",
+    "healthcheck-pingfederate",
+]
+
+
+def match_selector(selector: str, get_value) -> bool:
+    """
+    Match an equality-based label or field selector, e.g. "app=ping-cloud,role!=pingdirectory,job-name"
+    :param selector: Selector string
+    :param get_value: Function returning the value of a label or field, None if it isn't set
+    :return: True if every requirement matches
+    """
+    for requirement in filter(None, selector.split(",")):
+        if "!=" in requirement:
+            key, value = requirement.split("!=", 1)
+            if get_value(key) == value:
+                return False
+        elif "=" in requirement:
+            key, value = requirement.replace("==", "=").split("=", 1)
+            if get_value(key) != value:
+                return False
+        elif get_value(requirement) is None:
+            return False
+    return True
+
+
+def get_field(obj: dict, field: str):
+    value = obj
+    for name in field.split("."):
+        value = value.get(name) if isinstance(value, dict) else None
+    return value
+
+
+class FakeKubeApi:
+    """
+    In-memory Kubernetes API server for pods, jobs, cron jobs, namespaces and ingresses, served over HTTP so the real
+    kubernetes client can be used against it. Supports list with label/field selectors and limit/continue, watch
+    from a resourceVersion, and create. Created jobs get a pod that succeeds after job_seconds.
+    """
+
+    def __init__(self, job_seconds: float = JOB_SECONDS):
+        self.job_seconds = job_seconds
+        self.objects = {resource: {} for resource in RESOURCES}
+        self.resource_version = 0
+        # Every change as (resourceVersion, resource, event type, object), for watches to replay from. Nothing is
+        # compacted, so watches never get 410 Gone.
+        self.events = []
+        self.changed = threading.Condition()
+        self.calls = Counter()
+        self.server = None
+
+    def start(self) -> str:
+        """
+        Serve the API on a local port
+        :return: API server URL
+        """
+        api = self
+
+        class Handler(FakeKubeApiHandler):
+            fake_api = api
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="fake-kube-api", daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def put(self, resource: str, obj: dict, event_type: str = "ADDED") -> dict:
+        with self.changed:
+            self.resource_version += 1
+            obj["metadata"]["resourceVersion"] = str(self.resource_version)
+            key = (obj["metadata"].get("namespace"), obj["metadata"]["name"])
+            self.objects[resource][key] = obj
+            self.events.append((self.resource_version, resource, event_type, obj))
+            self.changed.notify_all()
+        return obj
+
+    def list(self, resource: str, namespace: str, query: dict) -> dict:
+        label_selector = query.get("labelSelector", "")
+        field_selector = query.get("fieldSelector", "")
+        with self.changed:
+            resource_version = self.resource_version
+            objects = sorted(self.objects[resource].items(), key=lambda item: (item[0][0] or "", item[0][1]))
+
+        items = [
+            obj for _, obj in objects
+            if (namespace is None or obj["metadata"].get("namespace") == namespace)
+            and match_selector(label_selector, lambda key: obj["metadata"].get("labels", {}).get(key))
+            and match_selector(field_selector, lambda key: get_field(obj, key))
+        ]
+
+        # The continue token is simply the offset of the next page
+        start = int(query.get("continue", 0))
+        limit = int(query.get("limit", 0)) or len(items)
+        metadata = {"resourceVersion": str(resource_version)}
+        if start + limit < len(items):
+            metadata["continue"] = str(start + limit)
+
+        api_path, kind = RESOURCES[resource]
+        return {
+            "apiVersion": api_path.split("/", 2)[-1],
+            "kind": f"{kind}List",
+            "metadata": metadata,
+            "items": items[start:start + limit],
+        }
+
+    def watch(self, resource: str, namespace: str, query: dict):
+        """Yield watch events as dictionaries until timeoutSeconds, starting after resourceVersion"""
+        deadline = time.monotonic() + int(query.get("timeoutSeconds", 60))
+        label_selector = query.get("labelSelector", "")
+        field_selector = query.get("fieldSelector", "")
+
+        def matches(obj):
+            return (
+                (namespace is None or obj["metadata"].get("namespace") == namespace)
+                and match_selector(label_selector, lambda key: obj["metadata"].get("labels", {}).get(key))
+                and match_selector(field_selector, lambda key: get_field(obj, key))
+            )
+
+        resource_version = query.get("resourceVersion")
+        if resource_version in (None, "", "0"):
+            # Without a resourceVersion the watch starts with every existing object
+            listed = self.list(resource, namespace, {})
+            for obj in listed["items"]:
+                if matches(obj):
+                    yield {"type": "ADDED", "object": obj}
+            resource_version = listed["metadata"]["resourceVersion"]
+
+        # Every change gets the next resourceVersion, so the event after resourceVersion N is at index N
+        next_event = min(int(resource_version), len(self.events))
+        while True:
+            with self.changed:
+                while next_event >= len(self.events):
+                    remaining_seconds = deadline - time.monotonic()
+                    if remaining_seconds <= 0:
+                        return
+                    self.changed.wait(remaining_seconds)
+                events = self.events[next_event:]
+                next_event = len(self.events)
+
+            for _, event_resource, event_type, obj in events:
+                if event_resource == resource and matches(obj):
+                    yield {"type": event_type, "object": obj}
+
+    def create(self, resource: str, namespace: str, obj: dict) -> dict:
+        obj = json.loads(json.dumps(obj))
+        obj["metadata"]["namespace"] = namespace
+        obj["metadata"].setdefault("uid", f"uid-{self.resource_version + 1}")
+        obj["metadata"].setdefault("creationTimestamp", "2023-01-01T00:00:00Z")
+        obj = self.put(resource, obj)
+        if resource == "jobs":
+            self.start_job(obj)
+        return obj
+
+    def start_job(self, job: dict):
+        job_name = job["metadata"]["name"]
+        pod = make_pod(job["metadata"]["namespace"], f"{job_name}-{random.getrandbits(20):05x}",
+                       {"job-name": job_name}, phase="Pending")
+        self.put("pods", pod)
+
+        def complete():
+            # Stored objects are shared with the recorded events, so changes are made to copies
+            succeeded_pod = json.loads(json.dumps(pod))
+            succeeded_pod["status"]["phase"] = "Succeeded"
+            succeeded_pod["status"]["containerStatuses"][0]["state"] = {
+                "terminated": {"exitCode": 0, "reason": "Completed", "finishedAt": "2023-01-01T00:00:01Z"}
+            }
+            self.put("pods", succeeded_pod, "MODIFIED")
+            completed_job = json.loads(json.dumps(job))
+            completed_job["status"] = {"succeeded": 1, "conditions": [{"type": "Complete", "status": "True"}]}
+            self.put("jobs", completed_job, "MODIFIED")
+
+        timer = threading.Timer(self.job_seconds, complete)
+        timer.daemon = True
+        timer.start()
+
+    def seed(self, pod_count: int, seed: int = 0):
+        """
+        Fill the API with a synthetic ping cloud cluster: the ping-cloud and health namespaces with their pods, cron
+        jobs and ingresses, and tenant namespaces with filler pods and ingresses up to pod_count pods
+        :param pod_count: Total number of pods
+        :param seed: Random seed so that every run sees the same cluster
+        """
+        rand = random.Random(seed)
+        namespaces = ["ping-cloud", "health", "elastic-stack-logging"]
+        namespaces += [f"tenant-{index:03d}" for index in range(max(1, pod_count // 50))]
+        for namespace in namespaces:
+            self.put("namespaces", {"metadata": {"name": namespace, "labels": {"name": namespace}},
+                                    "status": {"phase": "Active"}})
+
+        pods = [("ping-cloud", f"pingdirectory-{index}", {"role": "pingdirectory"}) for index in range(3)]
+        pods += [("ping-cloud", f"pingfederate-{index}", {"role": "pingfederate-engine"}) for index in range(2)]
+        pods += [("ping-cloud", "pingfederate-admin-0", {"role": "pingfederate-admin"}),
+                 ("ping-cloud", "pingcloud-healthcheck-5d8f7-abcde", {"role": "pingcloud-healthcheck"}),
+                 ("elastic-stack-logging", "es-cluster-hot-0", {"app": "elasticsearch"})]
+        while len(pods) < pod_count:
+            namespace = rand.choice(namespaces[3:])
+            pods.append((namespace, f"app-{len(pods)}-{rand.getrandbits(24):06x}", {"app": f"app-{len(pods) % 20}"}))
+        for namespace, name, labels in pods:
+            self.put("pods", make_pod(namespace, name, labels))
+
+        for job_name in HEALTH_CRON_JOBS:
+            self.put("cronjobs", make_cron_job("health", job_name))
+
+        ingresses = [("ping-cloud", "healthcheck-ingress", "healthcheck.ping-demo.com", "healthcheck"),
+                     ("ping-cloud", "pingfederate-admin-ingress", "pingfederate-admin-api-dev.ping-demo.com",
+                      "pingfederate-admin")]
+        ingresses += [(rand.choice(namespaces[3:]), f"app-{index}-ingress", f"app-{index}.tenant.ping-demo.com",
+                       f"app-{index}") for index in range(pod_count // 10)]
+        for namespace, name, host, service in ingresses:
+            self.put("ingresses", make_ingress(namespace, name, host, service))
+
+
+def make_pod(namespace: str, name: str, labels: dict, phase: str = "Running") -> dict:
+    return {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "labels": dict(labels, app=labels.get("app", "ping-cloud")),
+            "annotations": {"kubectl.kubernetes.io/restartedAt": "2023-01-01T00:00:00Z"},
+            "uid": f"{namespace}-{name}",
+            "creationTimestamp": "2023-01-01T00:00:00Z",
+        },
+        "spec": {
+            "nodeName": "ip-10-0-0-1.us-west-2.compute.internal",
+            "containers": [{
+                "name": name.rsplit("-", 1)[0],
+                "image": f"public.ecr.aws/r2h3l6e4/{name.rsplit('-', 1)[0]}/dev:v1.18-release-branch-latest",
+                "env": [{"name": f"ENV_VAR_{index}", "value": "value"} for index in range(10)],
+                "resources": {"requests": {"cpu": "100m", "memory": "256Mi"}},
+            }],
+        },
+        "status": {
+            "phase": phase,
+            "conditions": [{"type": "Ready", "status": str(phase == "Running"),
+                            "lastTransitionTime": "2023-01-01T00:00:00Z"}],
+            "containerStatuses": [{
+                "name": name.rsplit("-", 1)[0],
+                "ready": phase == "Running",
+                "restartCount": 0,
+                "image": "image",
+                "imageID": "image-id",
+                "state": {"running": {"startedAt": "2023-01-01T00:00:00Z"}} if phase == "Running" else
+                {"waiting": {"reason": "ContainerCreating"}},
+            }],
+        },
+    }
+
+
+def make_cron_job(namespace: str, name: str) -> dict:
+    return {
+        "apiVersion": "batch/v1",
+        "kind": "CronJob",
+        "metadata": {"name": name, "namespace": namespace, "uid": f"{namespace}-{name}",
+                     "creationTimestamp": "2023-01-01T00:00:00Z"},
+        "spec": {
+            "schedule": "* * * * *",
+            "jobTemplate": {
+                "metadata": {"name": name},
+                "spec": {"template": {"spec": {"restartPolicy": "OnFailure", "containers": [
+                    {"name": name, "image": "public.ecr.aws/r2h3l6e4/pingcloud-services/robot-framework/dev:latest"}
+                ]}}},
+            },
+        },
+        "status": {},
+    }
+
+
+def make_ingress(namespace: str, name: str, host: str, service: str) -> dict:
+    return {
+        "apiVersion": "networking.k8s.io/v1",
+        "kind": "Ingress",
+        "metadata": {"name": name, "namespace": namespace, "uid": f"{namespace}-{name}",
+                     "creationTimestamp": "2023-01-01T00:00:00Z"},
+        "spec": {
+            "tls": [{"hosts": [host]}],
+            "rules": [{"host": host, "http": {"paths": [{
+                "path": "/",
+                "pathType": "Prefix",
+                "backend": {"service": {"name": service, "port": {"number": 443}}},
+            }]}}],
+        },
+    }
+
+
+class FakeKubeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake_api = None
+
+    def parse_path(self):
+        """
+        Parse a collection path, e.g. /api/v1/pods or /apis/batch/v1/namespaces/health/jobs
+        :return: (resource, namespace or None, query dictionary), resource is None for unknown paths
+        """
+        url = urllib.parse.urlparse(self.path)
+        query = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        for resource, (api_path, _) in RESOURCES.items():
+            if not url.path.startswith(f"{api_path}/"):
+                continue
+            parts = url.path[len(api_path) + 1:].split("/")
+            if parts == [resource]:
+                return resource, None, query
+            if len(parts) == 3 and parts[0] == "namespaces" and parts[2] == resource:
+                return resource, parts[1], query
+        return None, None, query
+
+    def send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        resource, namespace, query = self.parse_path()
+        if resource is None:
+            self.send_json(404, {"kind": "Status", "code": 404, "message": f"{self.path} not found"})
+            return
+
+        if query.get("watch") in ("true", "True", "1"):
+            self.fake_api.calls[f"watch {resource}"] += 1
+            # One chunk per event like the real API server, the client only sees a chunk once it's complete
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for event in self.fake_api.watch(resource, namespace, query):
+                    data = json.dumps(event).encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+            return
+
+        self.fake_api.calls[f"list {resource}"] += 1
+        self.send_json(200, self.fake_api.list(resource, namespace, query))
+
+    def do_POST(self):
+        resource, namespace, _ = self.parse_path()
+        if resource is None or namespace is None:
+            self.send_json(404, {"kind": "Status", "code": 404, "message": f"{self.path} not found"})
+            return
+
+        self.fake_api.calls[f"create {resource}"] += 1
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.send_json(201, self.fake_api.create(resource, namespace, body))
+
+    def log_message(self, format, *args):
+        pass
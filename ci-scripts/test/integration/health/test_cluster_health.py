@@ -1,7 +1,5 @@
 import unittest
 
-import requests
-
 from health_common import Categories, TestHealthBase
 
 
@@ -13,11 +11,10 @@ class TestClusterHealth(TestHealthBase):
         self.test_results = self.get_test_results(self.cluster_health, Categories.cluster_members)
 
     def test_cluster_health_cron_job_exists(self):
-        cron_jobs = self.batch_client.list_cron_job_for_all_namespaces()
         cron_job_name = next(
             (
                 cron_job.metadata.name
-                for cron_job in cron_jobs.items
+                for cron_job in self.list_cron_jobs()
                 if cron_job.metadata.name == self.job_name
             ),
             "",
@@ -29,9 +26,9 @@ class TestClusterHealth(TestHealthBase):
         )
 
     def test_health_check_has_cluster_health_results(self):
-        res = requests.get(self.endpoint, verify=False)
+        report = self.get_report()
         self.assertTrue(
-            self.cluster_health in res.json()["health"].keys(),
+            self.cluster_health in report["health"].keys(),
             "No cluster health in health check results",
         )
 
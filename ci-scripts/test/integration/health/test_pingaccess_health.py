@@ -1,5 +1,3 @@
-import requests
-
 from health_common import Categories, TestHealthBase
 
 
@@ -8,11 +6,10 @@ class TestPingAccessHealth(TestHealthBase):
     pingaccess = "pingAccess"
 
     def test_pingaccess_health_cron_job_exists(self):
-        cron_jobs = self.batch_client.list_cron_job_for_all_namespaces()
         cron_job_name = next(
             (
                 cron_job.metadata.name
-                for cron_job in cron_jobs.items
+                for cron_job in self.list_cron_jobs()
                 if cron_job.metadata.name == self.job_name
             ),
             "",
@@ -24,9 +21,9 @@ class TestPingAccessHealth(TestHealthBase):
         )
 
     def test_health_check_has_pingaccess_results(self):
-        res = requests.get(self.endpoint, verify=False)
+        report = self.get_report()
         self.assertTrue(
-            self.pingaccess in res.json()["health"].keys(),
+            self.pingaccess in report["health"].keys(),
             f"No {self.pingaccess} in health check results",
         )
 
@@ -1,29 +1,37 @@
-import requests
-
 from health_common import Categories, TestHealthBase
 
 
 class TestPingDirectoryHealth(TestHealthBase):
     job_name = "healthcheck-pingdirectory"
     pingdirectory = "pingDirectory"
+    base_dn_pattern = r"\w+\.*\w+"
 
     def setUp(self) -> None:
         self.ping_cloud_ns = next((ns for ns in self.get_namespace_names() if ns.startswith(self.ping_cloud)), self.ping_cloud)
         self.pod_names = self.get_namespaced_pod_names(self.ping_cloud_ns, r"pingdirectory-\d+")
 
-    def prometheus_test_patterns_by_pod(self, query: str):
-        # baseDN pattern (pingdirectory-N example.com query)
-        patterns = [rf"{name} \w+\.*\w+ {query}" for name in self.pod_names]
-        # appintegrations pattern (pingdirectory-N o_appintegrations_query)
-        patterns += [f"{name} o_appintegrations_{query}" for name in self.pod_names]
-        return patterns
+    def assert_metric_for_every_pod(self, metric: str):
+        index = self.get_result_index()
+        # baseDN tests (pingdirectory-N example.com metric) and appintegrations tests (pingdirectory-N o_appintegrations_metric)
+        # The metric is a prefix of the test's last word, so suffixed names such as replica_backlog_count also count
+        expected_tests = [(metric, self.base_dn_pattern, "<baseDN> "), (f"o_appintegrations_{metric}", "", "")]
+        for expected_metric, qualifier_pattern, qualifier in expected_tests:
+            missing_pods = index.get_pods_missing_metric(
+                self.pingdirectory, Categories.data, self.pod_names, expected_metric, qualifier_pattern
+            )
+            for pod_name in self.pod_names:
+                with self.subTest(f"{pod_name} {qualifier}{expected_metric}"):
+                    self.assertNotIn(
+                        pod_name,
+                        missing_pods,
+                        f"No '{pod_name} {qualifier}{expected_metric}' checks found in health check results",
+                    )
 
     def test_pingdirectory_health_cron_job_exists(self):
-        cron_jobs = self.batch_client.list_cron_job_for_all_namespaces()
         cron_job_name = next(
             (
                 cron_job.metadata.name
-                for cron_job in cron_jobs.items
+                for cron_job in self.list_cron_jobs()
                 if cron_job.metadata.name == self.job_name
             ),
             "",
@@ -35,10 +43,10 @@ class TestPingDirectoryHealth(TestHealthBase):
         )
 
     def test_health_check_has_pingdirectory_results(self):
-        res = requests.get(self.endpoint, verify=False)
+        report = self.get_report()
         self.assertIn(
             self.pingdirectory,
-            res.json()["health"].keys(),
+            report["health"].keys(),
             f"No {self.pingdirectory} in health check results",
         )
 
@@ -52,37 +60,10 @@ class TestPingDirectoryHealth(TestHealthBase):
         )
 
     def test_health_check_has_replica_backlog_count_results(self):
-        test_results = self.get_test_results(self.pingdirectory, Categories.data)
-        test_results = " ".join(test_results.keys())
-        expected_test_patterns = self.prometheus_test_patterns_by_pod("replica_backlog")
-        for expected_test in expected_test_patterns:
-            with self.subTest(expected_test):
-                self.assertRegex(
-                    test_results,
-                    expected_test,
-                    f"No '{expected_test}' checks found in health check results",
-                )
+        self.assert_metric_for_every_pod("replica_backlog")
 
     def test_health_check_has_failed_replayed_updates_results(self):
-        test_results = self.get_test_results(self.pingdirectory, Categories.data)
-        test_results = " ".join(test_results.keys())
-        expected_test_patterns = self.prometheus_test_patterns_by_pod("replica_failed_replayed_updates")
-        for expected_test in expected_test_patterns:
-            with self.subTest(expected_test):
-                self.assertRegex(
-                    test_results,
-                    expected_test,
-                    f"No '{expected_test}' checks found in health check results",
-                )
+        self.assert_metric_for_every_pod("replica_failed_replayed_updates")
 
     def test_health_check_has_unresolved_naming_conflicts_results(self):
-        test_results = self.get_test_results(self.pingdirectory, Categories.data)
-        test_results = " ".join(test_results.keys())
-        expected_test_patterns = self.prometheus_test_patterns_by_pod("replica_unresolved_naming_conflicts")
-        for expected_test in expected_test_patterns:
-            with self.subTest(expected_test):
-                self.assertRegex(
-                    test_results,
-                    expected_test,
-                    f"No '{expected_test}' checks found in health check results",
-                )
+        self.assert_metric_for_every_pod("replica_unresolved_naming_conflicts")
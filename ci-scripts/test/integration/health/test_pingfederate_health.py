@@ -1,5 +1,3 @@
-import requests
-
 from health_common import Categories, TestHealthBase
 
 
@@ -12,11 +10,10 @@ class TestPingFederateHealth(TestHealthBase):
         self.pod_names = self.get_namespaced_pod_names(self.ping_cloud_ns, r"pingfederate-(?:|admin-)\d+")
 
     def test_pingfederate_health_cron_job_exists(self):
-        cron_jobs = self.batch_client.list_cron_job_for_all_namespaces()
         cron_job_name = next(
             (
                 cron_job.metadata.name
-                for cron_job in cron_jobs.items
+                for cron_job in self.list_cron_jobs()
                 if cron_job.metadata.name == self.job_name
             ),
             "",
@@ -28,9 +25,9 @@ class TestPingFederateHealth(TestHealthBase):
         )
 
     def test_health_check_has_pingfederate_results(self):
-        res = requests.get(self.endpoint, verify=False)
+        report = self.get_report()
         self.assertTrue(
-            self.pingfederate in res.json()["health"].keys(),
+            self.pingfederate in report["health"].keys(),
             f"No {self.pingfederate} in health check results",
         )
 
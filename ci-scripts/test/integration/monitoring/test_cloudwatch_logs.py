@@ -1,9 +1,12 @@
 import unittest
 import os
 import json
+import threading
 import boto3
 import k8s_utils
 
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 dt_now = datetime.now()
@@ -11,12 +14,21 @@ delta = dt_now - timedelta(hours=0, minutes=30)
 dt_now_ms = round(dt_now.timestamp() * 1000)
 dt_past_ms = round(delta.timestamp() * 1000)
 
+# Time slices of the log window fetched concurrently. FilterLogEvents has a default quota of 5 requests per second per
+# account, so the default stays below it and the adaptive retries of the client back off when it's throttled.
+CW_LOG_FETCH_SLICES = int(os.getenv("CW_LOG_FETCH_SLICES", 4))
+CW_LOG_FETCH_MAX_ATTEMPTS = int(os.getenv("CW_LOG_FETCH_MAX_ATTEMPTS", 10))
+
 
 class TestCloudWatchLogs(k8s_utils.K8sUtils):
     log_lines = int(os.getenv("LOG_LINES_TO_TEST", 10))
 
     aws_region = os.getenv("AWS_REGION", "us-west-2")
-    aws_client = boto3.client("logs", region_name=aws_region)
+    aws_client = boto3.client(
+        "logs",
+        region_name=aws_region,
+        config=Config(retries={"mode": "adaptive", "max_attempts": CW_LOG_FETCH_MAX_ATTEMPTS}),
+    )
 
     # Change the pod_name, pod_namespace, and container_name to use this test with another application.
     pod_name = "es-cluster-hot-0"
@@ -26,34 +38,58 @@ class TestCloudWatchLogs(k8s_utils.K8sUtils):
     log_group_name = f"/aws/containerinsights/{k8s_cluster_name}/application"
     log_stream_name = f"{pod_name}_{pod_namespace}_{container_name}.cw_out"
 
-    def get_latest_cw_logs(self) -> list:
-        events = []
-        cw_logs = []
-        # first request
-        response = self.aws_client.get_log_events(
-            logGroupName=self.log_group_name,
-            logStreamName=self.log_stream_name,
-            startTime=dt_past_ms,
-            endTime=dt_now_ms,
-            startFromHead=False)
-        events.extend(response['events'])
-
-        # second and later
-        while True:
-            prev_token = response['nextForwardToken']
-            response = self.aws_client.get_log_events(
-                logGroupName=self.log_group_name,
-                logStreamName=self.log_stream_name,
-                nextToken=prev_token)
-            # same token then break
-            if response['nextForwardToken'] == prev_token:
-                break
-            events.extend(response['events'])
-
-        for event in events:
-            cw_logs.append(json.loads(event["message"])["log"].replace("\n", ""))
-
-        return cw_logs
+    # Logs of the time window, fetched once for every test of the class
+    cw_logs = None
+    cw_logs_lock = threading.Lock()
+
+    @classmethod
+    def get_latest_cw_logs(cls) -> list:
+        with cls.cw_logs_lock:
+            if cls.cw_logs is None:
+                cls.cw_logs = cls.fetch_cw_logs(dt_past_ms, dt_now_ms)
+            return cls.cw_logs
+
+    @classmethod
+    def fetch_cw_logs(cls, start_ms: int, end_ms: int, slices: int = CW_LOG_FETCH_SLICES) -> list:
+        """
+        Fetch the log stream's logs by splitting the time window into slices that are paged through concurrently
+        :param start_ms: Window start, epoch milliseconds
+        :param end_ms: Window end, epoch milliseconds
+        :param slices: Number of time slices, fetched on as many threads
+        :returns: Log lines in timestamp order
+        """
+        # An empty window has no slices to fetch
+        if end_ms <= start_ms:
+            return []
+
+        slice_ms = max(1, -(-(end_ms - start_ms) // max(1, slices)))
+        bounds = [(slice_start, min(slice_start + slice_ms, end_ms))
+                  for slice_start in range(start_ms, end_ms, slice_ms)]
+
+        with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+            # Slices are fetched in parallel but returned in window order, so merging is concatenation
+            slice_events = executor.map(lambda bound: cls.fetch_cw_log_events(*bound, bound[1] == end_ms), bounds)
+            return [
+                json.loads(event["message"])["log"].replace("\n", "")
+                for events in slice_events
+                for event in events
+            ]
+
+    @classmethod
+    def fetch_cw_log_events(cls, start_ms: int, end_ms: int, include_end: bool) -> list:
+        """Page through the events of one time slice, endTime is inclusive so only the last slice keeps its end"""
+        paginator = cls.aws_client.get_paginator("filter_log_events")
+        events = [
+            event
+            for page in paginator.paginate(
+                logGroupName=cls.log_group_name,
+                logStreamNames=[cls.log_stream_name],
+                startTime=start_ms,
+                endTime=end_ms if include_end else end_ms - 1,
+            )
+            for event in page["events"]
+        ]
+        return sorted(events, key=lambda event: event["timestamp"])
 
     def test_cloudwatch_log_group_exists(self):
         response = self.aws_client.describe_log_groups(
@@ -7,11 +7,14 @@ from k8s_utils import K8sUtils
 
 class TestHealthcheck(K8sUtils):
     def test_healthcheck_pod_exists(self):
-        pods = self.core_client.list_pod_for_all_namespaces(watch=False)
         res = next(
             (
                 pod.metadata.name
-                for pod in pods.items
+                for pod in self.iter_list(
+                    self.core_client.list_pod_for_all_namespaces,
+                    fields=["metadata.name"],
+                    label_selector="role=pingcloud-healthcheck",
+                )
                 if pod.metadata.name.startswith("pingcloud-healthcheck")
             ),
             False,
@@ -1,24 +1,27 @@
+import os
 import unittest
-import time
 
-from kubernetes import client, config
+from k8s_utils import K8sUtils
 
 
-class TestPingOneConfigurator(unittest.TestCase):
-    core_client = None
+class TestPingOneConfigurator(K8sUtils):
+    job_name = "pingone-configurator"
+    timeout_seconds = int(os.getenv("PINGONE_CONFIGURATOR_TIMEOUT_SECONDS", 1800))
 
     @classmethod
     def setUpClass(cls):
-        config.load_kube_config()
-        cls.core_client = client.CoreV1Api()
-      
+        # Only the pod selectors are needed, not the healthcheck endpoint (and the ingress listing it takes)
+        cls.create_clients()
 
     def test_pingoneconfigurator_pod_exists(self):
-        pods = self.core_client.list_pod_for_all_namespaces(watch=False)
         res = next(
             (
                 pod.metadata.name
-                for pod in pods.items
+                for pod in self.iter_list(
+                    self.core_client.list_pod_for_all_namespaces,
+                    fields=["metadata.name"],
+                    label_selector=f"job-name={self.job_name}",
+                )
                 if pod.metadata.name.startswith("pingone-configurator")
             ),
             False,
@@ -26,31 +29,25 @@ class TestPingOneConfigurator(unittest.TestCase):
         self.assertTrue(res)
 
     def test_pingoneconfigurator_pod_complete(self):
-        res = None
-        while res is None:
-            pods = self.core_client.list_pod_for_all_namespaces(watch=False)
-            container_statuses = next(
-                (
-                    pod.status.container_statuses
-                    for pod in pods.items
-                    if pod.metadata.name.startswith("pingone-configurator")
-                ),
-                False,
-                
-            )
-            res = next(
+        def get_terminated_state(pod):
+            return next(
                 (
                     container.state.terminated
-                    for container in container_statuses
+                    for container in pod.status.container_statuses or []
                     if container.name.startswith("pingone-configurator")
                 ),
-                False,
+                None,
             )
-            if not res: 
-                time.sleep(10)
 
-        self.assertEquals("Completed",res.reason)
-    
-        
+        pod, _ = self.wait_for(
+            self.core_client.list_pod_for_all_namespaces,
+            lambda pod: get_terminated_state(pod) is not None,
+            self.timeout_seconds,
+            label_selector=f"job-name={self.job_name}",
+        )
+        self.assertIsNotNone(pod, f"{self.job_name} pod didn't complete within {self.timeout_seconds} seconds")
+        self.assertEqual("Completed", get_terminated_state(pod).reason)
+
+
 if __name__ == "__main__":
     unittest.main()
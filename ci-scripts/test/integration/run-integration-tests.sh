@@ -57,12 +57,15 @@ execute_test_scripts() {
     REQUIREMENTS="${PROJECT_DIR}/ci-scripts/test/python-utils/requirements.txt"
     pip3.9 install -r ${REQUIREMENTS}
     log "Running python tests from: ${test_directory}"
-    START=$(pwd)
-    cd ${test_directory}
-    python3 -Wignore::ResourceWarning -m unittest -v
+    # Test modules run in parallel worker processes, each loading its own kube config and cluster snapshots
+    junit_args=()
+    if [[ -n "${PYTHON_TEST_REPORT_DIR}" ]]; then
+      mkdir -p "${PYTHON_TEST_REPORT_DIR}"
+      junit_args=(--junit-xml "${PYTHON_TEST_REPORT_DIR}/$(basename "${test_directory}").xml")
+    fi
+    python3 -Wignore::ResourceWarning -m parallel_test_runner -v -j "${PYTHON_TEST_JOBS:-8}" "${junit_args[@]}" "${test_directory}"
 
     test_result=$?
-    cd "$START"
     log "Test result: ${test_result}"
     echo
 
@@ -1,6 +1,11 @@
 from dataclasses import dataclass
+from datetime import datetime, timezone
 import os
+import re
+import threading
+import time
 
+import kubernetes as k8s
 import requests
 import urllib3
 
@@ -18,21 +23,318 @@ class Categories:
     cluster_members = "clusterMembers"
 
 
+class HealthJobOrchestrator:
+    """
+    Triggers every health job at once and waits for all of them over a single job watch, so each test class only
+    blocks on its own job. A job isn't triggered if its cron job succeeded within max_report_age_seconds.
+    """
+
+    def __init__(self, k8s_utils, timeout_seconds: int, max_report_age_seconds: int):
+        self.k8s_utils = k8s_utils
+        self.timeout_seconds = timeout_seconds
+        self.max_report_age_seconds = max_report_age_seconds
+        # Cron job name -> (created job name, namespace, deadline) of the jobs still running
+        self.running_jobs = {}
+        self.done = {}
+        self.errors = {}
+        self.watching = False
+        self.lock = threading.Lock()
+
+    def start(self, job_names: [str]):
+        """
+        Trigger the health jobs that haven't been triggered yet, and watch them until they finish
+        :param job_names: Health cron job names
+        """
+        for job_name in job_names:
+            if job_name in self.done:
+                continue
+            self.done[job_name] = threading.Event()
+            if self.is_report_fresh(job_name):
+                self.done[job_name].set()
+                continue
+            try:
+                job = self.k8s_utils.create_job(job_name)
+                with self.lock:
+                    self.running_jobs[job_name] = (
+                        job.metadata.name, job.metadata.namespace, time.monotonic() + self.timeout_seconds
+                    )
+            except (ValueError, k8s.client.exceptions.ApiException) as e:
+                self.errors[job_name] = e
+                self.done[job_name].set()
+
+        with self.lock:
+            if self.running_jobs and not self.watching:
+                self.watching = True
+                threading.Thread(target=self.watch_jobs, name="health-jobs", daemon=True).start()
+
+    def is_report_fresh(self, job_name: str) -> bool:
+        if self.max_report_age_seconds <= 0:
+            return False
+        cron_job = next(
+            (cron_job for cron_job in self.k8s_utils.list_cron_jobs() if cron_job.metadata.name == job_name),
+            None,
+        )
+        last_successful_time = cron_job.status.last_successful_time if cron_job and cron_job.status else None
+        if last_successful_time is None:
+            return False
+        return (datetime.now(timezone.utc) - last_successful_time).total_seconds() <= self.max_report_age_seconds
+
+    def watch_jobs(self):
+        watch = k8s.watch.Watch()
+        try:
+            while True:
+                with self.lock:
+                    self.expire_jobs()
+                    if not self.running_jobs:
+                        self.watching = False
+                        return
+                    deadline = max(deadline for _, _, deadline in self.running_jobs.values())
+
+                # The watch starts by listing every existing job, so jobs that finished before it started are seen too
+                for event in watch.stream(
+                    func=self.k8s_utils.batch_client.list_job_for_all_namespaces,
+                    timeout_seconds=max(1, int(deadline - time.monotonic())),
+                ):
+                    self.update(event["object"])
+                    if not self.running_jobs:
+                        watch.stop()
+                        break
+        except Exception:
+            # Stop blocking the test classes waiting for the jobs, they fail on the missing results instead
+            with self.lock:
+                for job_name in self.running_jobs:
+                    self.done[job_name].set()
+                self.running_jobs.clear()
+                self.watching = False
+            raise
+
+    def expire_jobs(self):
+        # Whatever is still running after its timeout stops blocking the test class waiting for it
+        now = time.monotonic()
+        for job_name, (_, _, deadline) in list(self.running_jobs.items()):
+            if now >= deadline:
+                del self.running_jobs[job_name]
+                self.done[job_name].set()
+
+    def update(self, job: k8s.client.V1Job):
+        with self.lock:
+            job_name = next(
+                (
+                    job_name
+                    for job_name, (created_name, namespace, _) in self.running_jobs.items()
+                    if job.metadata.name == created_name and job.metadata.namespace == namespace
+                ),
+                None,
+            )
+            if job_name is None or not self.is_finished(job):
+                return
+            del self.running_jobs[job_name]
+        self.done[job_name].set()
+
+    @staticmethod
+    def is_finished(job: k8s.client.V1Job) -> bool:
+        return any(
+            condition.type in ("Complete", "Failed") and condition.status == "True"
+            for condition in (job.status.conditions or [])
+        )
+
+    def wait(self, job_name: str):
+        """
+        Block until a health job has finished or timed out
+        :param job_name: Health cron job name
+        :raises: The error from creating the job, e.g. ValueError if there's no such cron job
+        """
+        self.done[job_name].wait()
+        if job_name in self.errors:
+            raise self.errors[job_name]
+
+
+class HealthcheckReportClient:
+    """
+    Healthcheck report client sharing one pooled session and one parsed copy of the report. The report is fetched
+    again once it's older than max_age_seconds or was fetched before a given time, using a conditional request when
+    the service returned an ETag or Last-Modified header.
+    """
+
+    def __init__(self, endpoint: str, max_age_seconds: int):
+        self.endpoint = endpoint
+        self.max_age_seconds = max_age_seconds
+        self.session = requests.Session()
+        self.session.verify = False
+        self.report = None
+        self.fetched_at = 0
+        self.validators = {}
+        self.lock = threading.Lock()
+
+    def get_report(self, fetched_after: float = 0) -> {}:
+        """
+        Get the parsed healthcheck report
+        :param fetched_after: Fetch the report again if the cached copy was fetched before this time.time()
+        :return: Healthcheck report dictionary
+        """
+        with self.lock:
+            now = time.time()
+            if self.report is not None and self.fetched_at >= fetched_after and \
+                    now - self.fetched_at < self.max_age_seconds:
+                return self.report
+
+            headers = self.validators if self.report is not None else {}
+            response = self.session.get(self.endpoint, headers=headers)
+            if response.status_code != 304:
+                self.report = response.json()
+                self.validators = {
+                    request_header: response.headers[response_header]
+                    for request_header, response_header in [("If-None-Match", "ETag"),
+                                                            ("If-Modified-Since", "Last-Modified")]
+                    if response_header in response.headers
+                }
+            self.fetched_at = now
+            return self.report
+
+
+class HealthResultIndex:
+    """
+    Test names of a healthcheck report indexed by suite and category, and for per-pod tests named
+    "<pod name> [qualifier] <metric name>" (e.g. "pingdirectory-0 example.com replica_backlog") by pod, metric name and
+    the qualifier between them
+    """
+
+    pod_name_pattern = re.compile(r"[a-z0-9]([-a-z0-9]*[a-z0-9])?-\d+")
+
+    def __init__(self, report: {}):
+        self.report = report
+        self.tests = {}
+        # (suite, category) -> metric name -> pod name -> set of qualifiers ("" for tests without one)
+        self.pods_by_metric = {}
+
+        for suite, suite_results in report["health"].items():
+            for category, tests in suite_results["tests"].items():
+                self.tests[suite, category] = tests
+                pods_by_metric = self.pods_by_metric.setdefault((suite, category), {})
+                for test_name in tests:
+                    words = test_name.split()
+                    if len(words) > 1 and self.pod_name_pattern.fullmatch(words[0]):
+                        qualifiers = pods_by_metric.setdefault(words[-1], {}).setdefault(words[0], set())
+                        qualifiers.add(" ".join(words[1:-1]))
+
+    def get_tests(self, suite: str, category: str) -> {}:
+        return self.tests.get((suite, category), {})
+
+    def find_tests(self, suite: str, category: str, substring: str) -> [str]:
+        return [test_name for test_name in self.get_tests(suite, category) if substring in test_name]
+
+    def get_pods_with_metric(self, suite: str, category: str, metric: str, qualifier_pattern: str = None) -> set:
+        """
+        Find the pods with a test for a metric
+        :param suite: Test suite
+        :param category: Category within the test suite
+        :param metric: Metric name, a prefix of the last word of the test name, e.g. "replica_backlog" also matches
+        "replica_backlog_count"
+        :param qualifier_pattern: Regex the words between the pod and metric names must fully match, e.g. a baseDN
+        pattern, or "" for tests without any. Any qualifier matches if not set.
+        :return: Set of the pod names with the metric
+        """
+        pattern = re.compile(qualifier_pattern) if qualifier_pattern is not None else None
+        return {
+            pod_name
+            for metric_name, qualifiers_by_pod in self.pods_by_metric.get((suite, category), {}).items()
+            if metric_name.startswith(metric)
+            for pod_name, qualifiers in qualifiers_by_pod.items()
+            if pattern is None or any(pattern.fullmatch(qualifier) for qualifier in qualifiers)
+        }
+
+    def get_pods_missing_metric(
+        self, suite: str, category: str, pod_names: [str], metric: str, qualifier_pattern: str = None
+    ) -> set:
+        """
+        Find the pods without a test for a metric
+        :param suite: Test suite
+        :param category: Category within the test suite
+        :param pod_names: Pods expected to have the metric
+        :param metric: Metric name, a prefix of the last word of the test name
+        :param qualifier_pattern: Only count the tests whose qualifier fully matches this regex, see
+        get_pods_with_metric
+        :return: Set of the pod names without the metric
+        """
+        return set(pod_names) - self.get_pods_with_metric(suite, category, metric, qualifier_pattern)
+
+
 class TestHealthBase(K8sUtils):
     job_name = ""
     ping_cloud = os.getenv("PING_CLOUD_NAMESPACE", "ping-cloud")
+    job_timeout_seconds = int(os.getenv("HEALTH_JOB_TIMEOUT_SECONDS", 180))
+    # Don't trigger a health job if its cron job succeeded within this many seconds, 0 to always trigger it
+    max_report_age_seconds = int(os.getenv("HEALTH_REPORT_MAX_AGE_SECONDS", 0))
+
+    report_max_age_seconds = int(os.getenv("HEALTHCHECK_REPORT_CACHE_SECONDS", 60))
+
+    orchestrator = None
+    orchestrator_lock = threading.Lock()
+    # Healthcheck report clients by endpoint, shared by every health test class
+    report_clients = {}
+    result_index = None
+    job_finished_at = 0
 
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        cls.run_job(cls.job_name)
+        cls.get_orchestrator().wait(cls.job_name)
+        cls.job_finished_at = time.time()
+
+    @classmethod
+    def get_orchestrator(cls) -> HealthJobOrchestrator:
+        """
+        Get the orchestrator shared by every health test class in the process, triggering the jobs of all the test
+        classes loaded so far that haven't been triggered yet
+        """
+        with TestHealthBase.orchestrator_lock:
+            if TestHealthBase.orchestrator is None:
+                TestHealthBase.orchestrator = HealthJobOrchestrator(
+                    cls, cls.job_timeout_seconds, cls.max_report_age_seconds
+                )
+            job_names = {test_class.job_name for test_class in cls.get_health_test_classes() if test_class.job_name}
+            job_names.add(cls.job_name)
+            TestHealthBase.orchestrator.start(sorted(job_names))
+            return TestHealthBase.orchestrator
+
+    @staticmethod
+    def get_health_test_classes() -> list:
+        test_classes = []
+        pending = list(TestHealthBase.__subclasses__())
+        while pending:
+            test_class = pending.pop()
+            test_classes.append(test_class)
+            pending.extend(test_class.__subclasses__())
+        return test_classes
+
+    def get_report(self) -> {}:
+        """
+        Get the healthcheck report, fetched after this test class's health job finished
+        :return: Healthcheck report dictionary
+        """
+        with TestHealthBase.orchestrator_lock:
+            client = TestHealthBase.report_clients.get(self.endpoint)
+            if client is None:
+                client = HealthcheckReportClient(self.endpoint, self.report_max_age_seconds)
+                TestHealthBase.report_clients[self.endpoint] = client
+        return client.get_report(fetched_after=self.job_finished_at)
+
+    def get_result_index(self) -> HealthResultIndex:
+        """
+        Get the result index of the current healthcheck report, only indexing each fetched copy once
+        :return: HealthResultIndex
+        """
+        report = self.get_report()
+        with TestHealthBase.orchestrator_lock:
+            if TestHealthBase.result_index is None or TestHealthBase.result_index.report is not report:
+                TestHealthBase.result_index = HealthResultIndex(report)
+            return TestHealthBase.result_index
 
     def get_test_results(self, suite: str, category: str) -> {}:
         """
-        Request test results from the healthcheck service and get a dictionary of the test names and PASS/FAIL result
+        Get a dictionary of the test names and PASS/FAIL result from the healthcheck report
         :param suite: Test suite
         :param category: Category within the test suite
         :return: Test results dictionary in the format {"test name": "PASS/FAIL", ...}
         """
-        response = requests.get(self.endpoint, verify=False)
-        return response.json()["health"][suite]["tests"][category]
+        return self.get_report()["health"][suite]["tests"][category]
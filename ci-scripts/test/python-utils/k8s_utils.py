@@ -1,11 +1,260 @@
+import copy
 import json
+import os
 import re
+import threading
+import time
 import unittest
 
 from datetime import datetime
 
 import kubernetes as k8s
 
+# Seconds a snapshot watch request stays open before it's renewed, and the wait before retrying a failed watch
+WATCH_TIMEOUT_SECONDS = 300
+WATCH_RETRY_SECONDS = 5
+
+# Bytes read from a streamed API response, e.g. a pod log or watch, at a time
+LOG_CHUNK_BYTES = 64 * 1024
+
+# Objects per page of a paginated list
+LIST_PAGE_SIZE = 500
+
+# Fields kept in the pod and namespace snapshots, which are read as raw JSON since clusters may have thousands of pods
+POD_FIELDS = ["metadata.labels", "status.phase"]
+NAMESPACE_FIELDS = ["status.phase"]
+
+# Seconds an ingress host index is used before the ingresses are listed again
+INGRESS_INDEX_TTL_SECONDS = int(os.getenv("INGRESS_INDEX_TTL_SECONDS", 300))
+
+# Ingress host indexes by label selector ("" for all ingresses), shared by every test class in the process
+ingress_indexes = {}
+ingress_indexes_lock = threading.Lock()
+
+
+class IngressHostIndex:
+    """The hosts of every rule of every ingress, indexed by backend service name ("service" and "namespace/service")"""
+
+    def __init__(self, ingresses: [dict]):
+        self.hosts = []
+        self.hosts_by_service = {}
+        self.created = time.monotonic()
+
+        for ingress in ingresses:
+            namespace = ingress["metadata"]["namespace"]
+            for rule in ingress["spec"].get("rules", []):
+                host = rule.get("host")
+                if not host:
+                    continue
+                self.hosts.append(host)
+                for path in rule.get("http", {}).get("paths", []):
+                    service = path["backend"].get("service", {}).get("name")
+                    if service:
+                        self.hosts_by_service.setdefault(service, host)
+                        self.hosts_by_service.setdefault(f"{namespace}/{service}", host)
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self.created > INGRESS_INDEX_TTL_SECONDS
+
+    def find_host(self, key: str) -> str:
+        """
+        Find the host of a backend service, or else the first host containing key
+        :param key: Service name, "namespace/service" or host substring
+        :returns: Host, or None if no ingress matches
+        """
+        host = self.hosts_by_service.get(key)
+        if host is None:
+            host = next((host for host in self.hosts if key in host), None)
+        return host
+
+
+def get_ingress_index(network_client, label_selector: str = "") -> IngressHostIndex:
+    """
+    Get the ingress host index for a label selector, listing the ingresses if there's no index yet or it has expired
+    :param network_client: NetworkingV1Api client
+    :param label_selector: Only index the ingresses matching this label selector, all ingresses if not set
+    :returns: IngressHostIndex
+    """
+    with ingress_indexes_lock:
+        index = ingress_indexes.get(label_selector)
+        if index is None or index.is_expired():
+            ingresses = list_raw(network_client.list_ingress_for_all_namespaces, label_selector=label_selector)
+            index = IngressHostIndex(ingresses["items"])
+            ingress_indexes[label_selector] = index
+        return index
+
+
+class Projection:
+    """Attribute access to the projected fields of a raw JSON API object, like the model objects, e.g. pod.metadata.name"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return f"Projection({', '.join(f'{name}={value!r}' for name, value in self.__dict__.items())})"
+
+
+def to_camel_case(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def project(raw_object: dict, fields: [str]) -> Projection:
+    """
+    Extract fields from a raw JSON API object
+    :param raw_object: API object as parsed JSON
+    :param fields: Model attribute paths, e.g. ["metadata.name", "status.phase"]. Missing fields are None, and
+    objects and lists are kept as parsed JSON.
+    :returns: Projection with only the fields
+    """
+    projection = Projection()
+    for field in fields:
+        *parents, leaf = field.split(".")
+        target = projection
+        value = raw_object
+        for name in parents:
+            value = value.get(to_camel_case(name)) if isinstance(value, dict) else None
+            if name not in target.__dict__:
+                setattr(target, name, Projection())
+            target = getattr(target, name)
+        setattr(target, leaf, value.get(to_camel_case(leaf)) if isinstance(value, dict) else None)
+    return projection
+
+
+def list_raw(list_func, **list_kwargs) -> dict:
+    """Call an API client list method for the raw JSON response, skipping the slow model deserialization"""
+    response = list_func(_preload_content=False, **list_kwargs)
+    try:
+        return json.loads(response.data)
+    finally:
+        response.release_conn()
+
+
+def iter_response_lines(response):
+    """Yield the lines of a streamed (_preload_content=False) API response as they arrive"""
+    partial_line = b""
+    for chunk in response.stream(LOG_CHUNK_BYTES, decode_content=True):
+        lines = (partial_line + chunk).split(b"\n")
+        partial_line = lines.pop()
+        yield from lines
+    if partial_line:
+        yield partial_line
+
+
+def watch_raw(list_func, resource_version: str, timeout_seconds: int, **list_kwargs):
+    """
+    Watch the objects listed by an API client list method and yield (event type, raw JSON object) without model
+    deserialization. Raises ApiException for error events, e.g. status 410 when resource_version is too old.
+    """
+    response = list_func(
+        watch=True,
+        resource_version=resource_version,
+        timeout_seconds=timeout_seconds,
+        _preload_content=False,
+        **list_kwargs,
+    )
+    try:
+        for line in iter_response_lines(response):
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["type"] == "ERROR":
+                raise k8s.client.exceptions.ApiException(
+                    status=event["object"].get("code"), reason=event["object"].get("message")
+                )
+            yield event["type"], event["object"]
+    finally:
+        response.close()
+        response.release_conn()
+
+
+class ResourceSnapshot:
+    """
+    In-memory copy of every object of one resource kind. The objects are listed once, then a background watch from
+    the list's resourceVersion applies every change, so reads never go to the API server. With fields, the objects
+    are read as raw JSON and only those fields are kept, as Projection objects.
+    """
+
+    def __init__(self, list_func, fields: [str] = None):
+        self.list_func = list_func
+        self.fields = None if fields is None else list(dict.fromkeys(["metadata.namespace", "metadata.name"] + fields))
+        self.objects = {}
+        self.resource_version = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.relist()
+        self.start_watch()
+
+    def start_watch(self):
+        threading.Thread(target=self.watch, name=f"snapshot-{self.list_func.__name__}", daemon=True).start()
+
+    def relist(self):
+        if self.fields is None:
+            result = self.list_func()
+            items = result.items
+            resource_version = result.metadata.resource_version
+        else:
+            result = list_raw(self.list_func)
+            items = [project(item, self.fields) for item in result["items"]]
+            resource_version = result["metadata"]["resourceVersion"]
+
+        objects = {self.get_key(obj): obj for obj in items}
+        with self.lock:
+            self.objects = objects
+            self.resource_version = resource_version
+
+    def watch(self):
+        while True:
+            try:
+                if self.fields is None:
+                    watch = k8s.watch.Watch()
+                    for event in watch.stream(
+                        self.list_func,
+                        resource_version=self.resource_version,
+                        timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                    ):
+                        self.apply(event["type"], event["object"])
+                        self.resource_version = watch.resource_version
+                else:
+                    for event_type, raw_object in watch_raw(
+                        self.list_func, self.resource_version, WATCH_TIMEOUT_SECONDS
+                    ):
+                        if event_type != "BOOKMARK":
+                            self.apply(event_type, project(raw_object, self.fields))
+                        self.resource_version = raw_object["metadata"]["resourceVersion"]
+            except k8s.client.exceptions.ApiException as e:
+                if e.status != 410:
+                    time.sleep(WATCH_RETRY_SECONDS)
+                # The resourceVersion is too old to resume from (410 Gone), or the watch failed: list again
+                self.relist_until_ok()
+            except Exception:
+                time.sleep(WATCH_RETRY_SECONDS)
+
+    def relist_until_ok(self):
+        while True:
+            try:
+                self.relist()
+                return
+            except Exception:
+                time.sleep(WATCH_RETRY_SECONDS)
+
+    def apply(self, event_type: str, obj):
+        key = self.get_key(obj)
+        with self.lock:
+            if event_type == "DELETED":
+                self.objects.pop(key, None)
+            elif event_type in ("ADDED", "MODIFIED"):
+                self.objects[key] = obj
+
+    @staticmethod
+    def get_key(obj) -> (str, str):
+        return obj.metadata.namespace, obj.metadata.name
+
+    def list(self) -> list:
+        with self.lock:
+            return list(self.objects.values())
+
 
 class K8sUtils(unittest.TestCase):
     """
@@ -19,79 +268,259 @@ class K8sUtils(unittest.TestCase):
     network_client = None
     endpoint = None
 
+    # Snapshots by list function name, shared by every test class in the process
+    snapshots = {}
+    snapshots_lock = threading.Lock()
+
     @classmethod
     def setUpClass(cls):
-        k8s.config.load_kube_config()
-        cls.batch_client = k8s.client.BatchV1Api()
-        cls.core_client = k8s.client.CoreV1Api()
-        cls.network_client = k8s.client.NetworkingV1Api()
+        cls.create_clients()
         cls.endpoint = cls.get_endpoint("healthcheck")
 
     @classmethod
-    def get_endpoint(cls, substring: str) -> str:
-        response = cls.network_client.list_ingress_for_all_namespaces(
-            _preload_content=False
-        )
-        routes = json.loads(response.data)
-        hostname = next(
-            (
-                route["spec"]["rules"][0]["host"]
-                for route in routes["items"]
-                if substring in route["spec"]["rules"][0]["host"]
-            ),
-            None,
-        )
+    def create_clients(cls):
+        """Load the kube config and create the API clients once per process, every test class shares them"""
+        with K8sUtils.snapshots_lock:
+            if K8sUtils.core_client is None:
+                k8s.config.load_kube_config()
+                K8sUtils.batch_client = k8s.client.BatchV1Api()
+                K8sUtils.core_client = k8s.client.CoreV1Api()
+                K8sUtils.network_client = k8s.client.NetworkingV1Api()
+
+    @classmethod
+    def prewarm(cls):
+        """Create the clients, load the ingress host index and list the shared snapshots ahead of the test classes"""
+        cls.setUpClass()
+        cls.list_cron_jobs()
+        cls.list_namespaces()
+        cls.list_pods()
+
+    @classmethod
+    def get_endpoint(cls, substring: str, label_selector: str = "") -> str:
+        """
+        Get the endpoint of an ingress host from the shared ingress host index
+        :param substring: Backend service name ("service" or "namespace/service"), or else a host substring
+        :param label_selector: Only look at the ingresses matching this label selector
+        :returns: http://host
+        """
+        hostname = get_ingress_index(cls.network_client, label_selector).find_host(substring)
         return f"http://{hostname}"
 
     @classmethod
-    def run_job(cls, name: str, wait: bool = True) -> k8s.client.V1Job:
-        cron_jobs = cls.batch_client.list_cron_job_for_all_namespaces()
+    def list_ingress_hosts(cls, label_selector: str = "") -> [str]:
+        return list(get_ingress_index(cls.network_client, label_selector).hosts)
+
+    @classmethod
+    def get_snapshot(cls, list_func, fields: [str] = None) -> ResourceSnapshot:
+        """
+        Get the shared snapshot of the resource kind listed by list_func, listing it the first time it's requested
+        :param list_func: API client list method for all namespaces, e.g. cls.core_client.list_pod_for_all_namespaces
+        :param fields: Only keep these fields of the objects, see ResourceSnapshot
+        :returns: ResourceSnapshot kept current by a watch
+        """
+        with cls.snapshots_lock:
+            snapshot = cls.snapshots.get(list_func.__name__)
+            if snapshot is None:
+                snapshot = ResourceSnapshot(list_func, fields)
+                snapshot.start()
+                cls.snapshots[list_func.__name__] = snapshot
+            return snapshot
+
+    @classmethod
+    def list_cron_jobs(cls) -> [k8s.client.V1CronJob]:
+        return cls.get_snapshot(cls.batch_client.list_cron_job_for_all_namespaces).list()
+
+    @classmethod
+    def list_namespaces(cls) -> [Projection]:
+        """
+        List namespaces from the shared namespace snapshot
+        :returns: List of namespaces with the metadata.name and NAMESPACE_FIELDS fields
+        """
+        return cls.get_snapshot(cls.core_client.list_namespace, NAMESPACE_FIELDS).list()
+
+    @classmethod
+    def list_pods(cls, namespace: str = None) -> [Projection]:
+        """
+        List pods from the shared pod snapshot
+        :param namespace: Only list the pods in this namespace, all namespaces if not set
+        :returns: List of pods with the metadata.namespace, metadata.name and POD_FIELDS fields
+        """
+        pods = cls.get_snapshot(cls.core_client.list_pod_for_all_namespaces, POD_FIELDS).list()
+        if namespace is None:
+            return pods
+        return [pod for pod in pods if pod.metadata.namespace == namespace]
+
+    @classmethod
+    def list_projected(cls, list_func, fields: [str], **list_kwargs) -> [Projection]:
+        """
+        List objects as raw JSON and only extract the given fields, much faster than deserializing models
+        :param list_func: API client list method, e.g. cls.core_client.list_namespaced_pod
+        :param fields: Model attribute paths, e.g. ["metadata.name", "status.phase"]
+        :param list_kwargs: list_func arguments, e.g. namespace or label_selector
+        :returns: List of Projection objects
+        """
+        return [project(item, fields) for item in list_raw(list_func, **list_kwargs)["items"]]
+
+    @classmethod
+    def iter_list(cls, list_func, fields: [str] = None, limit: int = LIST_PAGE_SIZE, **list_kwargs):
+        """
+        List objects page by page with limit and continue, so only one page is in memory at a time and the caller can
+        stop at the first match without listing the rest
+        :param list_func: API client list method, e.g. cls.core_client.list_pod_for_all_namespaces
+        :param fields: Only extract these fields from the raw JSON, see list_projected. Full models if not set.
+        :param limit: Objects per page
+        :param list_kwargs: list_func arguments to filter server-side, e.g. namespace, label_selector or field_selector
+        :returns: Generator of objects
+        """
+        continue_token = None
+        while True:
+            page_kwargs = dict(list_kwargs, limit=limit)
+            if continue_token:
+                page_kwargs["_continue"] = continue_token
+
+            if fields is None:
+                page = list_func(**page_kwargs)
+                yield from page.items
+                continue_token = page.metadata._continue
+            else:
+                page = list_raw(list_func, **page_kwargs)
+                yield from (project(item, fields) for item in page["items"])
+                continue_token = page["metadata"].get("continue")
+
+            if not continue_token:
+                return
+
+    @classmethod
+    def create_job(cls, name: str) -> k8s.client.V1Job:
+        """
+        Create a job from the job template of a cron job
+        :param name: Cron job name
+        :returns: The created job
+        """
         try:
-            job_body, job_namespace = next(
-                (cron_job.spec.job_template, cron_job.metadata.namespace)
-                for cron_job in cron_jobs.items
+            cron_job = next(
+                cron_job
+                for cron_job in cls.list_cron_jobs()
                 if cron_job.metadata.name == name
             )
         except StopIteration:
             raise ValueError(f"No cron job named '{name}' found")
 
+        # Copy the job template since the cron job is shared through the snapshot
+        job_body = copy.deepcopy(cron_job.spec.job_template)
         curr_time = datetime.now().strftime("%Y%m%d%H%M%S.%f")
         job_body.metadata.name = f"{name}-test-{curr_time}"
-        job = cls.batch_client.create_namespaced_job(
-            body=job_body, namespace=job_namespace
+        return cls.batch_client.create_namespaced_job(
+            body=job_body, namespace=cron_job.metadata.namespace
         )
 
+    @classmethod
+    def run_job(cls, name: str, wait: bool = True) -> k8s.client.V1Job:
+        job = cls.create_job(name)
+
         if wait:
-            cls.wait_for_job_complete(job_body.metadata.name, job_namespace)
+            cls.wait_for_job_complete(job.metadata.name, job.metadata.namespace)
 
         return job
 
     @classmethod
-    def wait_for_job_complete(cls, name: str, namespace: str):
-        watch = k8s.watch.Watch()
-        for event in watch.stream(
-            func=cls.core_client.list_namespaced_pod,
+    def wait_for(cls, list_func, condition, timeout_seconds: int = 60, **list_kwargs) -> (object, float):
+        """
+        Wait until an object listed by list_func satisfies a condition. The objects are listed once, then watched
+        from the list's resourceVersion, resuming from the last seen resourceVersion whenever a watch request ends.
+        :param list_func: API client list method, e.g. cls.core_client.list_namespaced_pod
+        :param condition: Function called with each object, returning True for the terminal object
+        :param timeout_seconds: Seconds to wait in total
+        :param list_kwargs: Arguments scoping list_func to the relevant objects, e.g. namespace, label_selector or
+        field_selector
+        :returns: (terminal object, elapsed seconds), the object is None if the wait timed out
+        """
+        start = time.monotonic()
+        resource_version = None
+        while True:
+            if resource_version is None:
+                result = list_func(**list_kwargs)
+                obj = next((obj for obj in result.items if condition(obj)), None)
+                if obj is not None:
+                    return obj, time.monotonic() - start
+                resource_version = result.metadata.resource_version
+
+            remaining_seconds = int(start + timeout_seconds - time.monotonic())
+            if remaining_seconds <= 0:
+                return None, time.monotonic() - start
+
+            watch = k8s.watch.Watch()
+            try:
+                for event in watch.stream(
+                    list_func,
+                    resource_version=resource_version,
+                    timeout_seconds=remaining_seconds,
+                    **list_kwargs,
+                ):
+                    resource_version = watch.resource_version
+                    if event["type"] != "DELETED" and condition(event["object"]):
+                        watch.stop()
+                        return event["object"], time.monotonic() - start
+            except k8s.client.exceptions.ApiException as e:
+                if e.status != 410:
+                    raise
+                # The resourceVersion is too old to resume from, list again
+                resource_version = None
+
+    @classmethod
+    def wait_for_job_complete(cls, name: str, namespace: str, timeout_seconds: int = 60) -> (k8s.client.V1Pod, float):
+        return cls.wait_for(
+            cls.core_client.list_namespaced_pod,
+            lambda pod: pod.status.phase in ["Succeeded", "Failed"],
+            timeout_seconds,
             namespace=namespace,
-            timeout_seconds=60,
-        ):
-            if event["object"].metadata.name.startswith(name) and event[
-                "object"
-            ].status.phase in ["Succeeded", "Failed"]:
-                watch.stop()
-                return
+            label_selector=f"job-name={name}",
+        )
 
     def get_latest_pod_logs(self, pod_name: str, container_name: str, pod_namespace: str, log_lines: int):
-        pod_logs = self.core_client.read_namespaced_pod_log(
-            name=pod_name, container=container_name, namespace=pod_namespace, tail_lines=int(log_lines)
+        return list(self.iter_pod_logs(pod_name, container_name, pod_namespace, tail_lines=int(log_lines)))
+
+    def iter_pod_logs(
+        self,
+        pod_name: str,
+        container_name: str,
+        pod_namespace: str,
+        tail_lines: int = None,
+        since_seconds: int = None,
+        limit_bytes: int = None,
+        follow: bool = False,
+    ):
+        """
+        Stream the log lines of a pod container as they arrive, without reading the whole log into memory
+        :param pod_name: Pod name
+        :param container_name: Container name
+        :param pod_namespace: Pod namespace
+        :param tail_lines: Only the last tail_lines lines of the log
+        :param since_seconds: Only the lines logged within the last since_seconds seconds
+        :param limit_bytes: Stop after limit_bytes bytes of the log
+        :param follow: Keep streaming new lines until the container stops or the caller stops iterating
+        :returns: Generator of log lines, without line endings
+        """
+        optional_params = {"tail_lines": tail_lines, "since_seconds": since_seconds, "limit_bytes": limit_bytes}
+        response = self.core_client.read_namespaced_pod_log(
+            name=pod_name,
+            container=container_name,
+            namespace=pod_namespace,
+            follow=follow,
+            _preload_content=False,
+            **{param: value for param, value in optional_params.items() if value is not None},
         )
-        pod_logs = pod_logs.splitlines()
-        return pod_logs
+        try:
+            for line in iter_response_lines(response):
+                yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+        finally:
+            response.close()
+            response.release_conn()
 
     def get_namespace_names(self):
-        namespaces = self.core_client.list_namespace()
         return [
             ns.metadata.name
-            for ns in namespaces.items
+            for ns in self.list_namespaces()
         ]
 
     def get_namespaced_pod_names(self, namespace: str, pod_name_pattern: str) -> [str]:
@@ -101,9 +530,8 @@ class K8sUtils(unittest.TestCase):
         :param pod_name_pattern: Regex pod name pattern to check against pod names
         :returns: {pod_name: pod_IP}
         """
-        pods = self.core_client.list_namespaced_pod(namespace)
         return [
             pod.metadata.name
-            for pod in pods.items
+            for pod in self.list_pods(namespace)
             if re.search(pod_name_pattern, pod.metadata.name)
         ]
@@ -0,0 +1,299 @@
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+class TimingTestResult(unittest.TextTestResult):
+    """Test result recording the outcome and duration of every test and setUpClass"""
+
+    def __init__(self, stream, descriptions, verbosity):
+        super().__init__(stream, descriptions, verbosity)
+        self.records = []
+        self.started_at = None
+
+    def startTest(self, test):
+        self.started_at = time.monotonic()
+        super().startTest(test)
+
+    def add_record(self, test, status: str, message: str = "", details: str = ""):
+        duration = time.monotonic() - self.started_at if self.started_at is not None else 0
+        class_name, _, test_name = test.id().rpartition(".")
+        self.records.append(
+            {
+                "class_name": class_name,
+                "name": test_name,
+                "time": duration,
+                "status": status,
+                "message": message,
+                "details": details,
+            }
+        )
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self.add_record(test, "passed")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.add_record(test, "failure", str(err[1]), self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        if isinstance(test, unittest.TestCase):
+            self.add_record(test, "error", str(err[1]), self.errors[-1][1])
+        else:
+            # setUpClass/setUpModule errors are reported against a placeholder, e.g. "setUpClass (module.Class)"
+            self.records.append(
+                {
+                    "class_name": test.description.partition("(")[2].rstrip(")"),
+                    "name": test.description.partition(" ")[0],
+                    "time": 0,
+                    "status": "error",
+                    "message": str(err[1]),
+                    "details": self.errors[-1][1],
+                }
+            )
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.add_record(test, "skipped", reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self.add_record(test, "passed")
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.add_record(test, "failure", "Unexpected success")
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            status = "failure" if issubclass(err[0], test.failureException) else "error"
+            details = (self.failures if status == "failure" else self.errors)[-1][1]
+            self.add_record(subtest, status, str(err[1]), details)
+
+
+def get_test_classes(suite) -> set:
+    test_classes = set()
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            test_classes |= get_test_classes(test)
+        elif isinstance(test, unittest.TestCase) and type(test).__module__ != "unittest.loader":
+            # Skip the placeholder test case of a module that failed to import
+            test_classes.add(type(test))
+    return test_classes
+
+
+def time_class_set_ups(suite) -> dict:
+    """
+    Wrap the setUpClass of every test class in the suite that defines its own, to time it. Subclasses inheriting a
+    wrapped setUpClass still run it with themselves as cls and are timed under their own name.
+    :param suite: Test suite
+    :return: Dictionary filled in with "module.Class" -> setUpClass seconds as the suite runs
+    """
+    set_up_times = {}
+
+    def timed(set_up_class):
+        def set_up(cls):
+            start = time.monotonic()
+            try:
+                set_up_class(cls)
+            finally:
+                set_up_times[f"{cls.__module__}.{cls.__qualname__}"] = time.monotonic() - start
+        set_up.__wrapped__ = set_up_class
+        return classmethod(set_up)
+
+    # Base classes of the suite's test classes may define the setUpClass they inherit
+    defining_classes = {
+        base
+        for test_class in get_test_classes(suite)
+        for base in test_class.__mro__
+        if isinstance(base.__dict__.get("setUpClass"), classmethod) and base is not unittest.TestCase
+    }
+    for test_class in defining_classes:
+        # A base class shared by several modules run in one process is re-wrapped from its original setUpClass
+        set_up_class = test_class.__dict__["setUpClass"].__func__
+        test_class.setUpClass = timed(getattr(set_up_class, "__wrapped__", set_up_class))
+    return set_up_times
+
+
+def group_by_module(suite, groups: dict = None) -> dict:
+    """
+    Group the tests of a discovered suite by module, keeping the discovery order
+    :param suite: Test suite from TestLoader.discover
+    :param groups: Dictionary to add to
+    :return: Dictionary of module name -> TestSuite
+    """
+    groups = {} if groups is None else groups
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            group_by_module(test, groups)
+        elif type(test).__module__ == "unittest.loader":
+            # Placeholder of a module that failed to import, named after that module
+            groups.setdefault(test._testMethodName, unittest.TestSuite()).addTest(test)
+        else:
+            groups.setdefault(type(test).__module__, unittest.TestSuite()).addTest(test)
+    return groups
+
+
+def run_suite(module_name: str, suite, verbosity: int) -> dict:
+    """
+    Run the tests of one module
+    :param module_name: Test module name
+    :param suite: The module's tests
+    :param verbosity: unittest verbosity
+    :return: Dictionary with the module's test records, setUpClass times, duration and unittest output
+    """
+    start = time.monotonic()
+    stream = io.StringIO()
+    set_up_times = time_class_set_ups(suite)
+    result = unittest.TextTestRunner(stream=stream, verbosity=verbosity, resultclass=TimingTestResult).run(suite)
+    return {
+        "module": module_name,
+        "records": result.records,
+        "set_up_times": set_up_times,
+        "time": time.monotonic() - start,
+        "output": stream.getvalue(),
+    }
+
+
+def run_module(module_name: str, verbosity: int) -> dict:
+    """Load and run the tests of one module in a worker process, see run_suite"""
+    try:
+        suite = unittest.defaultTestLoader.loadTestsFromName(module_name)
+    except Exception:
+        return get_error_result(module_name, "import", f"Failed to import {module_name}")
+    return run_suite(module_name, suite, verbosity)
+
+
+def get_error_result(module_name: str, name: str, message: str) -> dict:
+    """Result of a module whose tests couldn't run, with the current exception as the details"""
+    return {
+        "module": module_name,
+        "records": [{"class_name": module_name, "name": name, "time": 0, "status": "error", "message": message,
+                     "details": traceback.format_exc()}],
+        "set_up_times": {},
+        "time": 0,
+        "output": traceback.format_exc(),
+    }
+
+
+def prewarm():
+    from k8s_utils import K8sUtils
+    try:
+        K8sUtils.prewarm()
+    except Exception as e:
+        print(f"Failed to pre-warm the cluster context: {e}")
+
+
+def init_worker(prewarm_context: bool):
+    # Workers are spawned, not forked, so they start without the parent's threads and locks and warm their own context
+    if prewarm_context:
+        prewarm()
+
+
+def write_junit_xml(path: str, module_results: [dict]):
+    test_suites = ElementTree.Element("testsuites")
+    for module_result in module_results:
+        records = module_result["records"]
+        test_suite = ElementTree.SubElement(
+            test_suites,
+            "testsuite",
+            name=module_result["module"],
+            tests=str(len(records)),
+            failures=str(sum(record["status"] == "failure" for record in records)),
+            errors=str(sum(record["status"] == "error" for record in records)),
+            skipped=str(sum(record["status"] == "skipped" for record in records)),
+            time=f"{module_result['time']:.3f}",
+        )
+        # setUpClass durations are reported as test cases so they show up next to the tests they delay
+        for class_name, set_up_time in sorted(module_result["set_up_times"].items()):
+            ElementTree.SubElement(test_suite, "testcase", classname=class_name, name="setUpClass",
+                                   time=f"{set_up_time:.3f}")
+        for record in records:
+            test_case = ElementTree.SubElement(test_suite, "testcase", classname=record["class_name"],
+                                               name=record["name"], time=f"{record['time']:.3f}")
+            if record["status"] != "passed":
+                element = ElementTree.SubElement(test_case, record["status"], message=record["message"])
+                element.text = record["details"]
+
+    ElementTree.ElementTree(test_suites).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run the test modules discovered under a directory, serially in one pre-warmed process or in "
+                    "parallel worker processes that each warm their own cluster context."
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of test modules run at once in worker processes (default: 1, in this process)")
+    parser.add_argument("-p", "--pattern", default="test*.py", help="test module file pattern (default: test*.py)")
+    parser.add_argument("-v", "--verbose", action="store_const", const=2, default=1, dest="verbosity",
+                        help="verbose unittest output")
+    parser.add_argument("--junit-xml", metavar="PATH", help="write a JUnit XML report with test and setUpClass times")
+    parser.add_argument("--no-prewarm", action="store_true",
+                        help="don't load the kube config and cluster snapshots before starting the test modules")
+    parser.add_argument("start_dir", nargs="?", default=".", help="directory of the test modules (default: .)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.monotonic()
+
+    os.chdir(args.start_dir)
+    sys.path.insert(0, os.getcwd())
+    # Same discovery as python -m unittest, including test packages in subdirectories
+    suites_by_module = group_by_module(unittest.TestLoader().discover(".", pattern=args.pattern, top_level_dir="."))
+    jobs = max(1, min(args.jobs, len(suites_by_module)))
+
+    module_results = []
+    if jobs == 1:
+        # Every module is loaded before the first one runs, so the health job orchestrator sees all the health test
+        # classes and triggers their jobs together
+        if suites_by_module and not args.no_prewarm:
+            prewarm()
+        for module_name, suite in suites_by_module.items():
+            module_result = run_suite(module_name, suite, args.verbosity)
+            print(module_result["output"], end="")
+            module_results.append(module_result)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_worker, initargs=(not args.no_prewarm,)) as executor:
+            futures = {
+                executor.submit(run_module, module_name, args.verbosity): module_name
+                for module_name in suites_by_module
+            }
+            for future in as_completed(futures):
+                try:
+                    module_result = future.result()
+                except Exception as e:
+                    # A crashed worker breaks the pool, failing its module and every module that hadn't finished,
+                    # but the finished modules are still reported
+                    module_result = get_error_result(futures[future], "worker", f"Test worker failed: {e!r}")
+                print(f"===== {module_result['module']} ({module_result['time']:.1f}s) =====")
+                print(module_result["output"], end="")
+                module_results.append(module_result)
+        module_results.sort(key=lambda module_result: module_result["module"])
+
+    if args.junit_xml:
+        write_junit_xml(args.junit_xml, module_results)
+
+    records = [record for module_result in module_results for record in module_result["records"]]
+    failures = sum(record["status"] in ("failure", "error") for record in records)
+    print(f"\nRan {len(records)} test(s) from {len(module_results)} module(s) in {time.monotonic() - start:.1f}s "
+          f"with {jobs} worker(s), {failures} failure(s)")
+    for module_result in sorted(module_results, key=lambda module_result: module_result["time"], reverse=True):
+        set_up_time = sum(module_result["set_up_times"].values())
+        print(f"  {module_result['time']:8.1f}s  {module_result['module']} (setUpClass {set_up_time:.1f}s)")
+
+    sys.exit(1 if failures else 0)
@@ -142,7 +142,9 @@ cleanup() {
 if [[ "${IS_MULTI_CLUSTER}" == "true" ]]; then
   if [[ -f ./base/ping-cloud/descriptor.json ]]; then
     # Verify JSON and descriptor file content is valid
-    python3 ./validation/verify_descriptor_json.py ./base/ping-cloud/descriptor.json
+    # Uses the resident validation server if one is listening on DESCRIPTOR_VALIDATION_SOCKET, otherwise validates
+    # in-process
+    python3 ./validation/verify_descriptor_client.py ./base/ping-cloud/descriptor.json
   fi
 
 fi
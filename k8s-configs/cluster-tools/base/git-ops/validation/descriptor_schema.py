@@ -0,0 +1,100 @@
+from json_util import json_path
+
+
+class MinRegions:
+    """The descriptor must have at least count regions"""
+
+    def __init__(self, count):
+        self.count = count
+
+    def check_document(self, descriptor_json):
+        if len(descriptor_json) < self.count:
+            yield "$", f"descriptor.json must have {self.count} or more regions"
+
+
+class Required:
+    """Every region must have the key"""
+
+    def __init__(self, key):
+        self.key = key
+
+    def check_region(self, region_path, region, index):
+        if self.key not in region:
+            yield region_path, f"{self.key!r} key must be present within descriptor.json"
+
+
+class Numeric:
+    """The key must be a number in every region that has it"""
+
+    def __init__(self, key):
+        self.key = key
+
+    def check_region(self, region_path, region, index):
+        if self.key in region:
+            try:
+                int(region[self.key])
+            except (ValueError, TypeError):
+                yield json_path(region_path, self.key), \
+                    f"{self.key!r} key must be a number within descriptor.json {region[self.key]!r}"
+
+
+class Unique:
+    """The key's value must be different in every region"""
+
+    def __init__(self, key):
+        self.key = key
+
+    def check_region(self, region_path, region, index):
+        value = region.get(self.key)
+        if value is None:
+            return
+
+        # Set-like index of the values seen so far: value -> path of the region that has it
+        first_region_path = index.setdefault(value if isinstance(value, str) else repr(value), region_path)
+        if first_region_path != region_path:
+            yield json_path(region_path, self.key), \
+                f"{self.key!r} key must be unique within descriptor.json, {value!r} is also used by {first_region_path}"
+
+
+DESCRIPTOR_RULES = [
+    MinRegions(2),
+    Required("hostname"),
+    Required("replicas"),
+    Numeric("replicas"),
+    Unique("hostname"),
+]
+
+
+class DescriptorValidator:
+    """
+    Descriptor rules compiled into document and per-region checks applied in a single pass over the regions. Region
+    checks get an index dict of their own for each validation to keep cross-region state in.
+    """
+
+    def __init__(self, rules):
+        self.document_checks = [rule.check_document for rule in rules if hasattr(rule, "check_document")]
+        self.region_checks = [rule.check_region for rule in rules if hasattr(rule, "check_region")]
+
+    def validate(self, descriptor_json):
+        """Return every violation of the descriptor as a list of (key path, message) tuples"""
+        if not isinstance(descriptor_json, dict):
+            return [("$", "descriptor.json must be a JSON object of regions")]
+
+        violations = []
+        for check in self.document_checks:
+            violations.extend(check(descriptor_json))
+
+        region_checks = [(check, {}) for check in self.region_checks]
+        for region_name, region in descriptor_json.items():
+            region_path = json_path("$", region_name)
+            if not isinstance(region, dict):
+                violations.append((region_path, "region must be a JSON object within descriptor.json"))
+                continue
+
+            for check, index in region_checks:
+                violations.extend(check(region_path, region, index))
+
+        return violations
+
+
+DESCRIPTOR_VALIDATOR = DescriptorValidator(DESCRIPTOR_RULES)
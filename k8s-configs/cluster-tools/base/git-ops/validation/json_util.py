@@ -1,21 +1,58 @@
 import json
+import mmap
 import os
+import re
 import sys
 
+# Files at least this large are checked with the streaming parser instead of being loaded into memory
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
 
-def get_json(file_path):
-    """Open and read JSON file"""
+# One JSON token, preceded by optional whitespace. Anything else that isn't whitespace is an invalid token, so a match
+# only fails when nothing but whitespace is left.
+# Strings are matched as runs of plain characters separated by escapes. Runs and escapes can't overlap, so a
+# malformed string fails in linear time instead of backtracking over every way to split it.
+JSON_TOKEN = re.compile(rb"""
+    [ \t\n\r]*
+    (?:
+        (?P<string>"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*")
+      | (?P<punctuation>[{}\[\]:,])
+      | (?P<scalar>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null|NaN|-?Infinity)
+      | (?P<invalid>[^ \t\n\r])
+    )""", re.VERBOSE)
+
+# Streaming parser states
+VALUE, FIRST_VALUE, KEY, FIRST_KEY, COLON, AFTER_VALUE, END = range(7)
+
+
+def get_json(file_path, streaming=False):
+    """
+    Open and read JSON file. With streaming, the syntax rules are enforced without building the document, so memory
+    use is bounded by the nesting depth instead of the file size, and None is returned.
+    """
     # Verify if file exist and isn't empty
     if not os.path.exists(file_path):
         raise ValueError(f"{file_path} doesn't exist")
     elif os.path.exists(file_path) and os.stat(file_path).st_size == 0:
         raise ValueError(f"{file_path} exists but is empty")
 
+    if streaming:
+        for _, message in iter_json_syntax_errors(file_path):
+            raise ValueError(message)
+        return None
+
     with open(file_path) as json_file:
         json_dict = json.load(json_file, object_pairs_hook=enforce_json_syntax)
         return json_dict
 
 
+def parse_json(json_string):
+    """Parse a JSON string with the same syntax rules as get_json"""
+    if len(json_string.strip()) == 0:
+        raise ValueError("JSON content is empty")
+
+    return json.loads(json_string, object_pairs_hook=enforce_json_syntax)
+
+
 def enforce_json_syntax(ordered_pairs):
     """Reject Duplicate Keys and spaces within keys"""
     data = {}
@@ -33,6 +70,173 @@ def enforce_json_syntax(ordered_pairs):
     return data
 
 
+class JsonObjectPairs(list):
+    """Ordered (key, value) pairs of a JSON object, kept as-is so every syntax violation can be found"""
+
+
+def get_json_syntax_errors(file_path, strict=True, streaming=None):
+    """
+    Return every JSON syntax violation in a file as a list of (key path, message) tuples. Duplicate keys are always
+    violations, strict also applies the remaining enforce_json_syntax rules (spaces within keys and empty objects).
+    Streaming defaults to files of STREAMING_THRESHOLD_BYTES or more.
+    """
+    if not os.path.exists(file_path):
+        return [("$", f"{file_path} doesn't exist")]
+    elif os.stat(file_path).st_size == 0:
+        return [("$", f"{file_path} exists but is empty")]
+
+    if streaming or (streaming is None and os.stat(file_path).st_size >= STREAMING_THRESHOLD_BYTES):
+        return list(iter_json_syntax_errors(file_path, strict))
+
+    with open(file_path) as json_file:
+        try:
+            json_pairs = json.load(json_file, object_pairs_hook=JsonObjectPairs)
+        except ValueError as e:
+            return [("$", str(e))]
+
+    errors = []
+    collect_json_syntax_errors(json_pairs, "$", errors, strict)
+    return errors
+
+
+def collect_json_syntax_errors(value, path, errors, strict=True):
+    """Apply the enforce_json_syntax rules to every object under value, appending (key path, message) to errors"""
+    if isinstance(value, JsonObjectPairs):
+        if strict and len(value) == 0:
+            errors.append((path, "No keys were found"))
+
+        keys = set()
+        for key, child in value:
+            child_path = json_path(path, key)
+            if key in keys:
+                errors.append((child_path, "Duplicate key found: %r" % (key)))
+            if strict and " " in key:
+                errors.append((child_path, "No spaces are allowed within keys: %r" % (key)))
+            keys.add(key)
+            collect_json_syntax_errors(child, child_path, errors, strict)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            collect_json_syntax_errors(child, f"{path}[{index}]", errors, strict)
+
+
+def json_path(parent_path, key):
+    """Return the key path of a key within the object at parent_path, e.g. $.us-west-2.replicas"""
+    if key and all(char.isalnum() or char in "-_" for char in key):
+        return f"{parent_path}.{key}"
+    return f"{parent_path}[{json.dumps(key)}]"
+
+
+def iter_json_syntax_errors(file_path, strict=True):
+    """
+    Stream a non-empty JSON file from a memory map and yield the same (key path, message) violations as
+    get_json_syntax_errors. Only the keys of the currently open objects are kept, on a stack of sets, and the first
+    malformed token ends the scan.
+    """
+    with open(file_path, "rb") as json_file, \
+            mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # One frame per open container: [set of keys, current key] for objects, [None, current index] for arrays
+        frames = []
+        state = VALUE
+        position = 0
+        while True:
+            # Step from token to token instead of using finditer, which retries a failed match at every following
+            # position and so rescans trailing whitespace quadratically
+            match = JSON_TOKEN.match(data, position)
+            if match is None:
+                break
+            position = match.end()
+            kind = match.lastgroup
+            token = match.group(kind)
+            if token == b'"' and kind == "invalid":
+                yield "$", syntax_error("Unterminated string or invalid character in string", data, match.start(kind))
+                return
+
+            if state == VALUE or state == FIRST_VALUE:
+                if token == b"{":
+                    frames.append([set(), None])
+                    state = FIRST_KEY
+                elif token == b"[":
+                    frames.append([None, 0])
+                    state = FIRST_VALUE
+                elif token == b"]" and state == FIRST_VALUE:
+                    frames.pop()
+                    state = AFTER_VALUE if frames else END
+                elif kind == "string" or kind == "scalar":
+                    state = AFTER_VALUE if frames else END
+                else:
+                    yield "$", syntax_error("Expecting value", data, match.start(kind))
+                    return
+
+            elif state == KEY or state == FIRST_KEY:
+                if kind == "string":
+                    try:
+                        key = json.loads(token) if b"\\" in token else token[1:-1].decode()
+                    except ValueError as e:
+                        yield "$", syntax_error(str(e), data, match.start(kind))
+                        return
+
+                    keys = frames[-1][0]
+                    if key in keys:
+                        yield json_path(get_container_path(frames), key), "Duplicate key found: %r" % (key)
+                    if strict and " " in key:
+                        yield json_path(get_container_path(frames), key), "No spaces are allowed within keys: %r" % (key)
+                    keys.add(key)
+                    frames[-1][1] = key
+                    state = COLON
+                elif token == b"}" and state == FIRST_KEY:
+                    if strict:
+                        yield get_container_path(frames), "No keys were found"
+                    frames.pop()
+                    state = AFTER_VALUE if frames else END
+                else:
+                    yield "$", syntax_error("Expecting property name enclosed in double quotes", data, match.start(kind))
+                    return
+
+            elif state == COLON:
+                if token != b":":
+                    yield "$", syntax_error("Expecting ':' delimiter", data, match.start(kind))
+                    return
+                state = VALUE
+
+            elif state == AFTER_VALUE:
+                is_object = frames[-1][0] is not None
+                if token == b",":
+                    if is_object:
+                        state = KEY
+                    else:
+                        frames[-1][1] += 1
+                        state = VALUE
+                elif token == (b"}" if is_object else b"]"):
+                    frames.pop()
+                    state = AFTER_VALUE if frames else END
+                else:
+                    yield "$", syntax_error("Expecting ',' delimiter", data, match.start(kind))
+                    return
+
+            else:
+                yield "$", syntax_error("Extra data", data, match.start(kind))
+                return
+
+        if state != END:
+            yield "$", syntax_error("Unexpected end of JSON data", data, len(data))
+
+
+def get_container_path(frames):
+    """Return the key path of the innermost open container of the streaming parser"""
+    path = "$"
+    for keys, key_or_index in frames[:-1]:
+        path = json_path(path, key_or_index) if keys is not None else f"{path}[{key_or_index}]"
+    return path
+
+
+def syntax_error(message, data, position):
+    # Only reached once per file, so copying the data before the error to count lines is fine
+    line = data[:position].count(b"\n") + 1
+    column = position - data.rfind(b"\n", 0, position)
+    return f"{message}: line {line} column {column} (byte {position})"
+
+
 if __name__ == "__main__":
     descriptor_json_file = sys.argv[1]
-    get_json(descriptor_json_file)
+    get_json(descriptor_json_file,
+             streaming=os.path.getsize(descriptor_json_file) >= STREAMING_THRESHOLD_BYTES)
@@ -0,0 +1,120 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+
+from json_util import get_json, get_json_syntax_errors
+
+# Every file must be valid JSON without duplicate keys. Files matching these globs (against the relative path or the
+# file name) must also pass the strict json_util rules: no spaces within keys and no empty objects.
+STRICT_SYNTAX_PATTERNS = ["descriptor.json"]
+
+# Per-path rule sets: glob -> "module:function". The function is called with the parsed JSON of every matching file
+# and may raise ValueError or return (key path, message) tuples.
+RULE_SETS = {
+    "descriptor.json": "verify_descriptor_json:get_descriptor_violations",
+}
+SKIPPED_DIRS = {".git", "node_modules", "venv", ".venv", "__pycache__"}
+
+
+def find_json_files(paths):
+    """Yield every JSON file in the given files and directories"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+
+        for dir_path, dir_names, file_names in os.walk(path):
+            dir_names[:] = sorted(dir_name for dir_name in dir_names if dir_name not in SKIPPED_DIRS)
+            for file_name in sorted(file_names):
+                if file_name.endswith(".json"):
+                    yield os.path.join(dir_path, file_name)
+
+
+def matches(file_path, pattern):
+    relative_path = os.path.relpath(file_path).replace(os.sep, "/")
+    return fnmatch(relative_path, pattern) or fnmatch(os.path.basename(file_path), pattern)
+
+
+def get_rule_specs(file_path, rule_sets):
+    """Return the rule set functions ("module:function") that apply to a file"""
+    return [rule_spec for pattern, rule_spec in rule_sets.items() if matches(file_path, pattern)]
+
+
+def load_rule(rule_spec):
+    module_name, function_name = rule_spec.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def lint_file(file_path, strict, rule_specs):
+    """Return every (key path, message) failure of a file: JSON syntax first, then its rule sets"""
+    errors = get_json_syntax_errors(file_path, strict)
+    if errors or not rule_specs:
+        return errors
+
+    json_dict = get_json(file_path) if strict else get_json_without_syntax_rules(file_path)
+    for rule_spec in rule_specs:
+        try:
+            errors += load_rule(rule_spec)(json_dict) or []
+        except ValueError as e:
+            errors.append(("$", str(e)))
+
+    return errors
+
+
+def get_json_without_syntax_rules(file_path):
+    with open(file_path) as json_file:
+        return json.load(json_file)
+
+
+def lint_files(file_paths, strict_patterns, rule_sets, jobs):
+    """Lint files on a process pool and yield (file path, failures) in file order"""
+    strict = [any(matches(file_path, pattern) for pattern in strict_patterns) for file_path in file_paths]
+    rule_specs = [get_rule_specs(file_path, rule_sets) for file_path in file_paths]
+
+    if jobs == 1 or len(file_paths) < 2:
+        yield from zip(file_paths, map(lint_file, file_paths, strict, rule_specs))
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(file_paths) // (jobs * 4))
+        yield from zip(file_paths, executor.map(lint_file, file_paths, strict, rule_specs, chunksize=chunksize))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Validate every JSON file under the given paths and report all failures in one run."
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("--strict", action="append", default=[], metavar="GLOB",
+                        help="also apply the strict json_util syntax rules to the files matching GLOB")
+    parser.add_argument("--rule-set", action="append", default=[], metavar="GLOB=MODULE:FUNCTION",
+                        help="apply an additional rule set to the files matching GLOB")
+    parser.add_argument("paths", nargs="*", default=["."], help="files or directories to lint (default: .)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    rule_sets = dict(RULE_SETS)
+    for rule_set in args.rule_set:
+        pattern, rule_spec = rule_set.split("=", 1)
+        rule_sets[pattern] = rule_spec
+
+    json_files = list(find_json_files(args.paths))
+    failed_files = 0
+    failures = 0
+    for json_file, errors in lint_files(json_files, STRICT_SYNTAX_PATTERNS + args.strict, rule_sets, args.jobs):
+        if errors:
+            failed_files += 1
+            failures += len(errors)
+        for key_path, message in errors:
+            print(f"{json_file}: {key_path}: {message}")
+
+    print(f"{len(json_files)} JSON file(s) checked, {failures} failure(s) in {failed_files} file(s)")
+    sys.exit(1 if failures else 0)
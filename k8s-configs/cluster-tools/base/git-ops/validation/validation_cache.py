@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+
+# Constants
+# Per-user, since an entry is trusted to skip validation
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                 "ping-cloud-base", "descriptor-validation")
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 1024 * 1024
+VALIDATOR_MODULES = ["descriptor_schema.py", "json_util.py", "verify_descriptor_json.py"]
+
+
+def get_validator_version():
+    """Return a hash of the validator sources, so that changing any validation rule invalidates the cache"""
+    validator_hash = hashlib.sha256()
+    validation_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in VALIDATOR_MODULES:
+        with open(os.path.join(validation_dir, module), "rb") as module_file:
+            validator_hash.update(module_file.read())
+    return validator_hash.hexdigest()
+
+
+class ValidationCache:
+    """Remember which file contents already passed validation, keyed by content hash and validator version"""
+
+    def __init__(self, cache_dir=None, max_age_seconds=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.environ.get("DESCRIPTOR_VALIDATION_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else \
+            int(os.environ.get("DESCRIPTOR_VALIDATION_CACHE_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(os.environ.get("DESCRIPTOR_VALIDATION_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.validator_version = get_validator_version()
+
+    def is_trusted(self):
+        """
+        Return True if the cache directory is a real directory owned by the current user that nobody else can write
+        to, so that nobody else can have planted an entry in it
+        """
+        try:
+            dir_stat = os.lstat(self.cache_dir)
+        except OSError:
+            return False
+        return stat.S_ISDIR(dir_stat.st_mode) and dir_stat.st_uid == os.getuid() and \
+            not dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def get_entry_path(self, content):
+        """Return the cache entry path for file content (bytes)"""
+        key = hashlib.sha256(self.validator_version.encode() + b"\0" + content).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def is_valid(self, content):
+        """Return True if the content already passed validation with the current validator"""
+        if not self.is_trusted():
+            return False
+
+        entry_path = self.get_entry_path(content)
+        try:
+            if time.time() - os.stat(entry_path).st_mtime > self.max_age_seconds:
+                return False
+            # Refresh the entry so eviction removes the least recently used entries first
+            os.utime(entry_path)
+            return True
+        except OSError:
+            return False
+
+    def mark_valid(self, content, file_path=None):
+        """Record that the content passed validation. Failures are ignored since the cache is only an optimization."""
+        entry = {"file": file_path, "validated_at": time.time(), "validator_version": self.validator_version}
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            if not self.is_trusted():
+                return
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(entry, tmp_file)
+            os.replace(tmp_path, self.get_entry_path(content))
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self):
+        """Delete entries older than the max age, then the least recently used ones until under the max size"""
+        now = time.time()
+        entries = []
+        with os.scandir(self.cache_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if not dir_entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if now - mtime <= self.max_age_seconds and total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError:
+                pass
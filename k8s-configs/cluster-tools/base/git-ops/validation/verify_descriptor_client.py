@@ -0,0 +1,69 @@
+import json
+import os
+import socket
+import sys
+
+# Constants
+DEFAULT_SOCKET_PATH = "/tmp/verify-descriptor.sock"
+TIMEOUT_SECONDS = 10
+
+
+def get_socket_path():
+    """Return the validation server socket, shared by the client and verify_descriptor_json.py --serve"""
+    return os.environ.get("DESCRIPTOR_VALIDATION_SOCKET", DEFAULT_SOCKET_PATH)
+
+
+def request_validation(request, socket_path=None):
+    """
+    Send a validation request to a verify_descriptor_json.py --serve server.
+
+    Raises OSError if no server is listening on the socket.
+    """
+    socket_path = socket_path or get_socket_path()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(TIMEOUT_SECONDS)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as response_file:
+            response = response_file.readline()
+
+    if not response:
+        raise ConnectionError(f"No response from validation server on {socket_path}")
+
+    return json.loads(response)
+
+
+def verify(descriptor_json_file_path):
+    """
+    Verify a descriptor.json file (or its content from stdin for "-") on the validation server, falling back to
+    in-process validation when the server isn't running.
+    """
+    if descriptor_json_file_path == "-":
+        request = {"content": sys.stdin.read()}
+    else:
+        request = {"path": os.path.abspath(descriptor_json_file_path)}
+
+    try:
+        response = request_validation(request)
+    except OSError:
+        response = None
+
+    # Fall back outside of the except block, so validation errors aren't chained to the connection error
+    if response is None:
+        # Only import the validation code when there's no server to do the work
+        from verify_descriptor_json import get_validation_cache, handle_validation_request, verify_descriptor_file
+
+        if "path" not in request:
+            response = handle_validation_request(request)
+        else:
+            verify_descriptor_file(descriptor_json_file_path, get_validation_cache())
+            return
+
+    if not response["valid"]:
+        print(response["error"], file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    verify(sys.argv[1])
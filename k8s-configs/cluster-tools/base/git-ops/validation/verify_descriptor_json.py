@@ -1,42 +1,138 @@
+import argparse
+import json
+import os
 import sys
-from json_util import get_json
+from descriptor_schema import DESCRIPTOR_VALIDATOR
+from json_util import get_json, parse_json
+from validation_cache import ValidationCache
+from verify_descriptor_client import DEFAULT_SOCKET_PATH, get_socket_path
 
 
 def verify_descriptor(descriptor_json):
     """Wrapper method that calls all verification methods"""
     verify_json_schema(descriptor_json)
-    
 
-def verify_json_schema(descriptor_json):
-    """Verify hostname and replicas is included and that replicas is a number."""
-    regions = descriptor_json.keys()
 
-    """Verify that the descriptor.json has 2 or more regions"""
-    if len(regions) < 2:
+def get_descriptor_violations(descriptor_json):
+    """Return every descriptor rule violation as a list of (key path, message) tuples"""
+    return DESCRIPTOR_VALIDATOR.validate(descriptor_json)
+
+
+def verify_json_schema(descriptor_json):
+    """
+    Verify that there are 2 or more regions, that hostname and replicas are included in every region, that replicas
+    is a number and that hostnames are unique. Raises a ValueError listing every violation.
+    """
+    violations = get_descriptor_violations(descriptor_json)
+    if len(violations) == 1:
+        raise ValueError(violations[0][1])
+    elif violations:
         raise ValueError(
-            "descriptor.json must have 2 or more regions"
+            f"{len(violations)} problems found within descriptor.json:\n"
+            + "\n".join(f"  {path}: {message}" for path, message in violations)
         )
 
-    for region in regions:
-        if "hostname" not in descriptor_json[region]:
-            raise ValueError("'hostname' key must be present within descriptor.json")
-        if "replicas" not in descriptor_json[region]:
-            raise ValueError("'replicas' key must be present within descriptor.json")
 
-        try:
-            int(descriptor_json[region]["replicas"])
-        except ValueError:
-            raise ValueError(
-                "'replicas' key must be a number within descriptor.json %r"
-                % descriptor_json[region]["replicas"]
-            )
+def verify_descriptor_file(descriptor_json_file_path, cache=None):
+    """Verify a descriptor.json file, skipping parsing and validation if the cache has already seen its content"""
+    content = None
+    if cache is not None and os.path.isfile(descriptor_json_file_path):
+        with open(descriptor_json_file_path, "rb") as descriptor_json_file:
+            content = descriptor_json_file.read()
+        if cache.is_valid(content):
+            return
 
-if __name__ == "__main__":
-    descriptor_json_file_path = sys.argv[1]
-    
     # Generate descriptor.json as a dict
     descriptor_json = get_json(descriptor_json_file_path)
 
     verify_descriptor(descriptor_json)
 
+    if content is not None:
+        cache.mark_valid(content, descriptor_json_file_path)
+
+
+def get_validation_cache():
+    """Return the validation cache, or None if disabled through DESCRIPTOR_VALIDATION_CACHE_ENABLED"""
+    use_cache = os.environ.get("DESCRIPTOR_VALIDATION_CACHE_ENABLED", "true").lower() == "true"
+    return ValidationCache() if use_cache else None
+
+
+def handle_validation_request(request, cache=None):
+    """
+    Validate a {"path": descriptor.json path} or {"content": descriptor.json content} request and return
+    {"valid": true} or {"valid": false, "error": message}
+    """
+    try:
+        if "path" in request:
+            verify_descriptor_file(request["path"], cache)
+        elif "content" in request:
+            verify_descriptor(parse_json(request["content"]))
+        else:
+            raise ValueError("Validation request must contain 'path' or 'content'")
+    except (ValueError, TypeError, OSError) as e:
+        return {"valid": False, "error": f"{type(e).__name__}: {e}"}
+
+    return {"valid": True}
+
+
+def serve(socket_path):
+    """Validate newline-delimited JSON requests on a Unix socket until interrupted"""
+    import signal
+    import socketserver
+
+    cache = get_validation_cache()
+
+    class ValidationRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    response = handle_validation_request(json.loads(line), cache)
+                except ValueError as e:
+                    response = {"valid": False, "error": f"Invalid validation request: {e}"}
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    # Only the owner may connect, since the server reads any path it is sent
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, ValidationRequestHandler)
+    finally:
+        os.umask(previous_umask)
+
+    # Stop the same way on SIGTERM (e.g. pod shutdown) as on Ctrl-C, so the socket file is removed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Verify a descriptor.json file.")
+    parser.add_argument("--serve", nargs="?", const=get_socket_path(), metavar="SOCKET",
+                        help="keep running and validate requests on a Unix socket (default: "
+                             f"$DESCRIPTOR_VALIDATION_SOCKET, then {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("descriptor_json_file_path", nargs="?")
+    args = parser.parse_args()
+
+    if args.serve is None and args.descriptor_json_file_path is None:
+        parser.error("the descriptor.json file path is required unless serving")
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.serve is not None:
+        serve(args.serve)
+    else:
+        verify_descriptor_file(args.descriptor_json_file_path, get_validation_cache())
+
 